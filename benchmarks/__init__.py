@@ -0,0 +1,3 @@
+#####
+# Benchmarks for the engine, run from the repository root with: python -m benchmarks.<name>
+#####
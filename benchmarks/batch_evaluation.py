@@ -0,0 +1,75 @@
+#####
+# Checks the batch evaluation against basic_evaluate and check_game_over on random positions and reports
+# its throughput for growing batch sizes, next to evaluating the positions one by one
+# Usage: python -m benchmarks.batch_evaluation [amount of positions]
+#####
+
+import random
+import sys
+import time
+from benchmarks.game_over_check import random_positions
+from connectfour.AIManager import AIManager
+from connectfour.AIManager import BatchEvaluation
+from connectfour.LevelManager.Board import Board
+from connectfour.GameplayStatics import *
+
+# Sizes of the batches to time
+BATCH_SIZES = [1, 10, 100, 1000, 10000]
+
+
+def main():
+    amount = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+
+    random.seed(0)
+    positions = random_positions(amount)
+    packed = BatchEvaluation.pack_boards(positions)
+
+    # The board does not know the last move of a packed position, so compare with a board that does not either
+    outcomes = BatchEvaluation.batch_check_game_over(packed)
+    values = BatchEvaluation.batch_evaluate(packed)
+
+    for i, board in enumerate(positions):
+        board = board.copy()
+        board.last_move = -1
+
+        assert BatchEvaluation.BATCH_OUTCOMES[outcomes[i]] == board.check_game_over()
+        assert values[i] == AIManager.basic_evaluate(board)
+
+    print "%d positions checked" % amount
+
+    t = time.time()
+
+    for board in positions:
+        AIManager.basic_evaluate(board)
+
+    elapsed = time.time() - t
+
+    print "one by one:   %d positions/s" % (amount / elapsed)
+
+    # Packed positions, for example read from a file, have to be unpacked into boards first
+    states = [(int(player_mask), int(ai_mask), -1) for player_mask, ai_mask in packed]
+    board = Board()
+
+    t = time.time()
+
+    for state in states:
+        board.__setstate__(state)
+        AIManager.basic_evaluate(board)
+
+    elapsed = time.time() - t
+
+    print "unpacked:     %d positions/s" % (amount / elapsed)
+
+    for batch_size in BATCH_SIZES:
+        t = time.time()
+
+        for start in range(0, amount, batch_size):
+            BatchEvaluation.batch_evaluate(packed[start:start + batch_size])
+
+        elapsed = time.time() - t
+
+        print "batch %6d: %d positions/s" % (batch_size, amount / elapsed)
+
+
+if __name__ == '__main__':
+    main()
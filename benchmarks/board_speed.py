@@ -0,0 +1,111 @@
+#####
+# Measures the raw speed of the Board class and the amount of alpha-beta nodes searched per second
+# Usage: python -m benchmarks.board_speed [depth]
+#####
+
+import random
+import sys
+import time
+from connectfour.AIManager import AIManager
+from connectfour.LevelManager.Board import Board
+from connectfour.GameplayStatics import *
+
+# Moves leading to the middlegame position used for the search benchmarks, no move in it is forced
+BENCHMARK_MOVES = [3, 3, 3, 2, 4, 4, 2]
+
+
+def walk(board, depth, player):
+    """ Visits every position up to the given depth, returns the amount of visited positions
+    """
+    if depth == 0 or board.check_game_over() != OUTCOME_NOTHING:
+        return 1
+
+    nodes = 1
+    next_player = AI if player == PLAYER else PLAYER
+
+    for x in range(NUMBER_OF_COLUMNS):
+        if board.is_move_legal(x):
+            nodes += walk(board.make_move(x, player), depth - 1, next_player)
+
+    return nodes
+
+
+def count_alpha_beta_nodes(board, player, depth):
+    """ Runs a fixed-depth alpha-beta search and returns the amount of visited nodes
+    """
+    counter = [0]
+    original = AIManager.alpha_beta
+
+    def counting_alpha_beta(*args):
+        counter[0] += 1
+        return original(*args)
+
+    AIManager.alpha_beta = counting_alpha_beta
+
+    try:
+        AIManager.make_alpha_beta_move(board, AIManager.basic_evaluate, player, depth)
+    finally:
+        AIManager.alpha_beta = original
+
+    return counter[0]
+
+
+def benchmark_position():
+    """ Returns the board and the player to move for the alpha-beta benchmark
+    """
+    board = Board()
+    player = PLAYER
+
+    for move in BENCHMARK_MOVES:
+        board = board.make_move(move, player)
+        player = AI if player == PLAYER else PLAYER
+
+    return board, player
+
+
+def main():
+    depth = int(sys.argv[1]) if len(sys.argv) > 1 else 8
+
+    t = time.time()
+    nodes = walk(Board(), 6, PLAYER)
+    elapsed = time.time() - t
+
+    print "tree walk:  %d nodes in %.2f s, %d nodes/s" % (nodes, elapsed, nodes / elapsed)
+
+    # Evaluate positions of random games, excluding the time spent on making the moves
+    random.seed(0)
+    positions = []
+
+    for game in range(100):
+        board = Board()
+        player = PLAYER
+
+        while board.check_game_over() == OUTCOME_NOTHING:
+            board = board.make_move(random.choice([x for x in range(NUMBER_OF_COLUMNS) if board.is_move_legal(x)]),
+                                    player)
+            player = AI if player == PLAYER else PLAYER
+            positions.append(board)
+
+    t = time.time()
+
+    for board in positions:
+        AIManager.basic_evaluate(board)
+
+    elapsed = time.time() - t
+
+    print "evaluation: %d positions in %.2f s, %d positions/s" % (len(positions), elapsed, len(positions) / elapsed)
+
+    board, player = benchmark_position()
+
+    # The root moves are shuffled, fix the seed so that every run searches the same tree
+    random.seed(0)
+
+    t = time.time()
+    nodes = count_alpha_beta_nodes(board, player, depth)
+    elapsed = time.time() - t
+
+    print "alpha-beta: %d nodes in %.2f s, %d nodes/s (depth %d)" % (nodes, elapsed, nodes / elapsed, depth)
+
+
+if __name__ == '__main__':
+    main()
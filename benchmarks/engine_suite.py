@@ -0,0 +1,210 @@
+#####
+# Runs the alpha-beta search to a fixed depth on a curated set of opening, middlegame and endgame positions
+# in several engine configurations and measures the node count, the time to the depth, the nodes per second
+# and the transposition table hit rate of every search
+# The results are written to a JSON file, which a later run can be compared with to find regressions
+# Usage: python -m benchmarks.engine_suite run [--depth D] [--output results.json]
+#        python -m benchmarks.engine_suite compare baseline.json [results.json] [--threshold 0.1]
+#        A compare without a results file runs the suite first, with the depth of the baseline
+#####
+
+import argparse
+import json
+import platform
+import sys
+import time
+from connectfour.AIManager import AIManager
+from connectfour.AIManager.TimeManager import TimeManager
+from connectfour.AIManager.TranspositionTable import TranspositionTable
+from connectfour.LevelManager.Board import Board
+from connectfour.GameplayStatics import *
+from benchmarks.parallel_search import SUITE
+
+# Moves leading to the positions of the suite, by name, none of them is over or has a forced move
+POSITIONS = [
+    ('opening-empty', []),
+    ('opening-centre', [3, 3]),
+    ('opening-side', [2, 3, 4]),
+    ('middlegame-1', SUITE[0]),
+    ('middlegame-2', SUITE[1]),
+    ('middlegame-3', SUITE[2]),
+    ('middlegame-4', SUITE[3]),
+    ('endgame-1', [4, 3, 3, 3, 3, 4, 3, 4, 4, 3, 4, 4, 1, 1, 1, 5, 2, 1]),
+    ('endgame-2', [6, 3, 3, 3, 3, 3, 6, 6, 0, 3, 6, 0, 4, 0, 0, 6, 0, 4, 4, 0]),
+    ('endgame-3', [2, 1, 1, 1, 2, 2, 5, 2, 5, 4, 2, 4, 4, 1, 1, 4, 4, 5, 2, 3]),
+]
+
+# The engine configurations, by name: the AIManager globals they replace for the time of their searches
+CONFIGURATIONS = [
+    ('default', {}),
+    ('no-aspiration', {'ASPIRATION_WINDOW': 2 * INF}),
+    ('small-table', {'transposition_table': TranspositionTable(1)}),
+]
+
+# The metrics compared between runs and whether a greater value is better
+METRICS = [
+    ('nodes', False),
+    ('time', False),
+    ('nodes_per_second', True),
+    ('hit_rate', True),
+]
+
+
+def position_board(moves):
+    """ Returns the board after the given moves and the player to move on it
+    """
+    board = Board()
+    player = PLAYER
+
+    for move in moves:
+        board.play(move, player)
+        player = AI if player == PLAYER else PLAYER
+
+    return board, player
+
+
+def search_position(moves, depth):
+    """ Searches the position after the given moves to the given depth with an empty transposition table
+    Returns the metrics of the search
+    """
+    board, player = position_board(moves)
+
+    AIManager.transposition_table.clear()
+    AIManager.reset()
+    AIManager.nodes = 0
+
+    root_moves = [x for x in AIManager.CENTRE_ORDER if board.is_move_legal(x)]
+
+    t = time.time()
+    AIManager.iterative_deepening(board, AIManager.basic_evaluate, player, depth, TimeManager(INF), root_moves)
+    t = time.time() - t
+
+    return {
+        'nodes': AIManager.nodes,
+        'time': t,
+        'nodes_per_second': AIManager.nodes / t,
+        'hit_rate': AIManager.transposition_table.hit_rate(),
+    }
+
+
+def run_configuration(overrides, depth):
+    """ Searches all positions in the configuration given by its overrides of the AIManager globals
+    Returns the metrics of every position by its name
+    """
+    original = dict((name, getattr(AIManager, name)) for name in overrides)
+
+    for name, value in overrides.items():
+        setattr(AIManager, name, value)
+
+    try:
+        return dict((name, search_position(moves, depth)) for name, moves in POSITIONS)
+    finally:
+        for name, value in original.items():
+            setattr(AIManager, name, value)
+
+
+def run_suite(depth):
+    """ Runs the whole suite to the given depth and returns its results
+    """
+    # The moves must come from searching and not from the opening book
+    AIManager.opening_book.close()
+
+    results = {}
+
+    for name, overrides in CONFIGURATIONS:
+        results[name] = run_configuration(overrides, depth)
+
+        total_nodes = sum(metrics['nodes'] for metrics in results[name].values())
+        total_time = sum(metrics['time'] for metrics in results[name].values())
+
+        print "%-14s %10d nodes %8.2f s %8d nodes/s" % (name, total_nodes, total_time, total_nodes / total_time)
+
+    return {
+        'depth': depth,
+        'python': platform.python_version(),
+        'machine': platform.machine(),
+        'configurations': results,
+    }
+
+
+def compare(baseline, results, threshold):
+    """ Prints the changes of all metrics between the baseline and the results,
+    returns the amount of metrics that got worse by more than the threshold, a fraction of the baseline value
+    """
+    if baseline['depth'] != results['depth']:
+        print "the baseline was searched to depth %d, the results to depth %d" % (baseline['depth'], results['depth'])
+
+    regressions = 0
+
+    for configuration in sorted(results['configurations']):
+        if configuration not in baseline['configurations']:
+            print "%s: not in the baseline" % configuration
+            continue
+
+        for position in sorted(results['configurations'][configuration]):
+            if position not in baseline['configurations'][configuration]:
+                print "%s %s: not in the baseline" % (configuration, position)
+                continue
+
+            old = baseline['configurations'][configuration][position]
+            new = results['configurations'][configuration][position]
+
+            for metric, greater_is_better in METRICS:
+                if not old[metric]:
+                    continue
+
+                change = (new[metric] - old[metric]) / float(old[metric])
+                worse = -change if greater_is_better else change
+
+                flag = ""
+
+                if worse > threshold:
+                    flag = "  REGRESSION"
+                    regressions += 1
+
+                print "%-14s %-15s %-17s %14.4f -> %14.4f %+7.1f%%%s" % \
+                      (configuration, position, metric, old[metric], new[metric], 100 * change, flag)
+
+    print "%d regressions above %.0f%%" % (regressions, 100 * threshold)
+
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(prog='python -m benchmarks.engine_suite')
+    commands = parser.add_subparsers(dest='command')
+
+    run_parser = commands.add_parser('run', help='run the suite and write the results')
+    run_parser.add_argument('--depth', type=int, default=10)
+    run_parser.add_argument('--output', default='engine_suite.json')
+
+    compare_parser = commands.add_parser('compare', help='compare results with a baseline')
+    compare_parser.add_argument('baseline')
+    compare_parser.add_argument('results', nargs='?')
+    compare_parser.add_argument('--threshold', type=float, default=0.1)
+
+    args = parser.parse_args()
+
+    if args.command == 'run':
+        results = run_suite(args.depth)
+
+        with open(args.output, 'w') as f:
+            json.dump(results, f, indent=2, sort_keys=True)
+
+        print "results written to " + args.output
+    else:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+
+        if args.results is None:
+            results = run_suite(baseline['depth'])
+        else:
+            with open(args.results) as f:
+                results = json.load(f)
+
+        if compare(baseline, results, args.threshold):
+            sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
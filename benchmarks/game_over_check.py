@@ -0,0 +1,127 @@
+#####
+# Checks Board.check_game_over against the previous cell-by-cell line walk on random positions and times both
+# Usage: python -m benchmarks.game_over_check [positions]
+#####
+
+import random
+import sys
+import time
+from connectfour.LevelManager.Board import Board
+from connectfour.GameplayStatics import *
+
+
+def line_walk_check_game_over(board):
+    """ The previous implementation of Board.check_game_over, walking the four lines through the last move
+    The draw is checked after the win, so that a winning move filling the board is not reported as a draw
+    """
+
+    def check_line(x, y, x_step, y_step):
+        """ Checks a straight line from point (x, y) with step (x_step, y_step) for any 4 connected pieces
+        """
+        cnt = 0
+        prev = ' '
+
+        while 0 <= x < NUMBER_OF_COLUMNS and 0 <= y < NUMBER_OF_ROWS:
+            piece = board.get_piece(y, x)
+
+            if piece == prev:
+                cnt += 1
+
+                if cnt == NUMBER_TO_CONNECT:
+                    if prev == PLAYER:
+                        return OUTCOME_PLAYER
+                    elif prev == AI:
+                        return OUTCOME_AI
+            else:
+                prev = piece
+                cnt = 1
+
+            x += x_step
+            y += y_step
+
+        return OUTCOME_NOTHING
+
+    last_x = board.last_move
+    last_y = board.get_counter(board.last_move) - 1
+
+    minn_left = min(last_x, last_y)
+    minn_right = min(NUMBER_OF_COLUMNS - last_x - 1, last_y)
+
+    for outcome in [check_line(last_x, 0, 0, 1),
+                    check_line(0, last_y, 1, 0),
+                    check_line(last_x - minn_left, last_y - minn_left, 1, 1),
+                    check_line(last_x + minn_right, last_y - minn_right, -1, 1)]:
+        if outcome != OUTCOME_NOTHING:
+            return outcome
+
+    if [board.get_counter(x) for x in range(NUMBER_OF_COLUMNS)].count(NUMBER_OF_ROWS) == NUMBER_OF_COLUMNS:
+        return OUTCOME_DRAW
+
+    return OUTCOME_NOTHING
+
+
+def random_positions(amount):
+    """ Returns a list of positions reached by random play, including won, drawn and unfinished ones
+    """
+    positions = []
+
+    while len(positions) < amount:
+        board = Board()
+        player = PLAYER
+
+        # Stop at a random length, so that all stages of the game are represented
+        length = random.randint(1, NUMBER_OF_ROWS * NUMBER_OF_COLUMNS)
+
+        for i in range(length):
+            board = board.make_move(random.choice([x for x in range(NUMBER_OF_COLUMNS) if board.is_move_legal(x)]),
+                                    player)
+            positions.append(board)
+
+            if line_walk_check_game_over(board) != OUTCOME_NOTHING:
+                break
+
+            player = AI if player == PLAYER else PLAYER
+
+    return positions
+
+
+def time_check(check, positions):
+    """ Returns the time in seconds it takes to call check on all positions
+    """
+    t = time.time()
+
+    for board in positions:
+        check(board)
+
+    return time.time() - t
+
+
+def main():
+    amount = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+
+    random.seed(0)
+    positions = random_positions(amount)
+
+    outcomes = {}
+
+    for board in positions:
+        expected = line_walk_check_game_over(board)
+        outcome = board.check_game_over()
+
+        if outcome != expected:
+            board.print_board(sys.stdout)
+            raise AssertionError("check_game_over returned " + outcome + ", expected " + expected)
+
+        outcomes[outcome] = outcomes.get(outcome, 0) + 1
+
+    print "%d positions agree: %s" % (len(positions), outcomes)
+
+    line_walk_time = time_check(line_walk_check_game_over, positions)
+    bitboard_time = time_check(Board.check_game_over, positions)
+
+    print "line walk: %d checks/s" % (len(positions) / line_walk_time)
+    print "bitboard:  %d checks/s (%.1fx)" % (len(positions) / bitboard_time, line_walk_time / bitboard_time)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,73 @@
+#####
+# Measures the cold import time of the engine: LevelManager, AIManager and GameplayStatics are imported in fresh
+# processes, which must stay under the time budget and must not load Tk, so that no display is needed
+# Usage: python -m benchmarks.import_time [repetitions] [budget in milliseconds]
+#####
+
+import os
+import subprocess
+import sys
+
+# The longest the import of the engine may take (in milliseconds)
+IMPORT_TIME_BUDGET = 500
+
+# Modules of the user interface, none of them may be loaded by the engine
+GUI_MODULES = ['Tkinter', '_tkinter', 'tkinter']
+
+# Code run by the fresh process, prints the import time in milliseconds and the user interface modules it loaded
+IMPORT_CODE = """
+import sys
+import time
+t = time.time()
+import connectfour.LevelManager
+import connectfour.AIManager
+import connectfour.GameplayStatics
+t = time.time() - t
+print t * 1000
+print ' '.join(name for name in %r if name in sys.modules)
+""" % GUI_MODULES
+
+
+def import_engine():
+    """ Imports the engine in a fresh process without a display,
+    returns the import time in milliseconds and the user interface modules loaded
+    """
+    # Without a display creating a Tk root fails, so a GUI module loaded by mistake cannot go unnoticed
+    environment = dict(os.environ)
+    environment.pop('DISPLAY', None)
+
+    output = subprocess.check_output([sys.executable, '-c', IMPORT_CODE], env=environment).split('\n')
+
+    return float(output[0]), output[1].split()
+
+
+def main():
+    repetitions = int(sys.argv[1]) if len(sys.argv) > 1 else 5
+    budget = float(sys.argv[2]) if len(sys.argv) > 2 else IMPORT_TIME_BUDGET
+
+    times = []
+    loaded = set()
+
+    for i in range(repetitions):
+        try:
+            t, modules = import_engine()
+        except subprocess.CalledProcessError:
+            print "the engine cannot be imported without a display"
+            sys.exit(1)
+
+        times.append(t)
+        loaded.update(modules)
+
+    print "engine import: best %.0f ms, worst %.0f ms, budget %.0f ms" % (min(times), max(times), budget)
+
+    if loaded:
+        print "the engine loaded the user interface: " + ", ".join(sorted(loaded))
+        sys.exit(1)
+
+    if min(times) > budget:
+        print "over the budget"
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,62 @@
+#####
+# Measures the time-to-depth of the Lazy SMP search against the amount of search processes,
+# on the suite of middlegame positions used for the root-split search
+# Usage: python -m benchmarks.lazy_smp [depth] [max processes]
+#####
+
+import multiprocessing
+import sys
+import time
+from benchmarks.parallel_search import SUITE, suite_positions
+from connectfour.AIManager import AIManager
+from connectfour.AIManager import LazySMP
+from connectfour.LevelManager.Board import Board
+from connectfour.GameplayStatics import *
+
+
+def time_suite(processes, depth):
+    """ Returns the time in seconds it takes to search the whole suite to the given depth, starting every search
+    with an empty shared table
+    """
+    # Create the pool before starting the clock, it is kept between moves in a game
+    LazySMP.make_lazy_smp_move(Board(), AIManager.basic_evaluate, PLAYER, 1, INF, processes)
+
+    t = 0
+
+    for board, player in suite_positions():
+        LazySMP.shared_table.clear()
+
+        start = time.time()
+        LazySMP.make_lazy_smp_move(board, AIManager.basic_evaluate, player, depth, INF, processes)
+        t += time.time() - start
+
+    LazySMP.shutdown_pool()
+
+    return t
+
+
+def main():
+    depth = int(sys.argv[1]) if len(sys.argv) > 1 else 8
+    max_processes = int(sys.argv[2]) if len(sys.argv) > 2 else max(4, multiprocessing.cpu_count())
+
+    # The book would answer the positions without searching
+    AIManager.opening_book.close()
+
+    print "%d positions to depth %d, %d processor cores" % (len(SUITE), depth, multiprocessing.cpu_count())
+
+    serial = None
+    processes = 1
+
+    while processes <= max_processes:
+        t = time_suite(processes, depth)
+
+        if serial is None:
+            serial = t
+
+        print "%2d processes: %.2f s, speedup %.2f" % (processes, t, serial / t)
+
+        processes *= 2
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,57 @@
+#####
+# Measures the random games per second of the Monte Carlo tree search: played one by one, in batches with NumPy
+# and in batches split between growing amounts of processes
+# Usage: python -m benchmarks.monte_carlo [time in milliseconds] [max processes]
+#####
+
+import multiprocessing
+import sys
+from connectfour.AIManager import BatchEvaluation
+from connectfour.AIManager import MonteCarlo
+from connectfour.LevelManager.Board import Board
+from connectfour.GameplayStatics import *
+
+# Sizes of the batches to time
+BATCH_SIZES = [16, 64, 256, 1024]
+
+
+def games_per_second(time_limit, batch_size=1, processes=0):
+    """ Returns the amount of random games per second played by a search from the empty board with a new tree
+    """
+    MonteCarlo.monte_carlo_tree = MonteCarlo.MonteCarloTree()
+
+    # Create the pool before the search, it is kept between moves in a game
+    if processes:
+        MonteCarlo.get_pool(processes)
+
+    MonteCarlo.make_monte_carlo_move(Board(), None, PLAYER, time_limit=time_limit, batch_size=batch_size,
+                                     processes=processes)
+
+    return MonteCarlo.monte_carlo_tree.visits[MonteCarlo.monte_carlo_tree.root] * 1000.0 / time_limit
+
+
+def main():
+    time_limit = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    max_processes = int(sys.argv[2]) if len(sys.argv) > 2 else max(4, multiprocessing.cpu_count())
+
+    print "%d ms per search, %d processor cores" % (time_limit, multiprocessing.cpu_count())
+    print "one by one:                 %6d games/s" % games_per_second(time_limit)
+
+    if BatchEvaluation.numpy is not None:
+        for batch_size in BATCH_SIZES:
+            print "numpy, batch %4d:          %6d games/s" % (batch_size, games_per_second(time_limit, batch_size))
+
+    processes = 1
+
+    while processes <= max_processes:
+        for batch_size in BATCH_SIZES:
+            print "%2d processes, batch %4d:   %6d games/s" % \
+                  (processes, batch_size, games_per_second(time_limit, batch_size, processes))
+
+        processes *= 2
+
+    MonteCarlo.shutdown_pool()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,84 @@
+#####
+# Measures the speedup of the parallel root-split search against the amount of search processes,
+# on a fixed suite of middlegame positions searched to a fixed depth
+# Usage: python -m benchmarks.parallel_search [depth] [max processes]
+#####
+
+import multiprocessing
+import sys
+import time
+from connectfour.AIManager import AIManager
+from connectfour.AIManager import ParallelSearch
+from connectfour.LevelManager.Board import Board
+from connectfour.GameplayStatics import *
+
+# Moves leading to the positions of the suite, no move in them is forced
+SUITE = [
+    [3, 3, 3, 2, 4, 4, 2],
+    [3, 2, 4, 4, 1],
+    [0, 6, 3, 3, 2],
+    [3, 3, 2, 4, 4, 2, 5, 1],
+]
+
+
+def suite_positions():
+    """ Returns the boards of the suite together with the player to move on them
+    """
+    positions = []
+
+    for moves in SUITE:
+        board = Board()
+        player = PLAYER
+
+        for move in moves:
+            board = board.make_move(move, player)
+            player = AI if player == PLAYER else PLAYER
+
+        positions.append((board, player))
+
+    return positions
+
+
+def time_suite(processes, depth):
+    """ Returns the time in seconds it takes to search the whole suite to the given depth
+    """
+    # Create the pool before starting the clock, it is kept between moves in a game
+    ParallelSearch.make_parallel_alpha_beta_move(Board(), AIManager.basic_evaluate, PLAYER, 1, INF, processes)
+
+    t = time.time()
+
+    for board, player in suite_positions():
+        ParallelSearch.make_parallel_alpha_beta_move(board, AIManager.basic_evaluate, player, depth, INF, processes)
+
+    t = time.time() - t
+
+    ParallelSearch.shutdown_pool()
+
+    return t
+
+
+def main():
+    depth = int(sys.argv[1]) if len(sys.argv) > 1 else 8
+    max_processes = int(sys.argv[2]) if len(sys.argv) > 2 else max(4, multiprocessing.cpu_count())
+
+    # The book would answer the positions without searching
+    AIManager.opening_book.close()
+
+    print "%d positions to depth %d, %d processor cores" % (len(SUITE), depth, multiprocessing.cpu_count())
+
+    serial = None
+    processes = 1
+
+    while processes <= max_processes:
+        t = time_suite(processes, depth)
+
+        if serial is None:
+            serial = t
+
+        print "%2d processes: %.2f s, speedup %.2f" % (processes, t, serial / t)
+
+        processes *= 2
+
+
+if __name__ == '__main__':
+    main()
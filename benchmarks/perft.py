@@ -0,0 +1,60 @@
+#####
+# Checks the Board against the known perft counts of the empty board and measures its raw speed:
+# the amount of move sequences walked per second by perft, by perft split between processes at the root
+# and the amount of positions per second found by the walk of the different positions
+# Usage: python -m benchmarks.perft [depth] [unique positions depth] [processes]
+#####
+
+import sys
+import time
+from connectfour.LevelManager.Board import Board
+from connectfour.LevelManager.Perft import *
+from connectfour.GameplayStatics import *
+
+
+def check(name, count, expected, elapsed):
+    """ Prints the result of a walk and whether it agrees with the expected count, returns True if it does
+    """
+    status = "ok" if count == expected else "WRONG, expected %d" % expected
+
+    print "%-9s %10d in %7.2f s %9d/s  %s" % (name, count, elapsed, count / max(elapsed, 1e-6), status)
+
+    return count == expected
+
+
+def main():
+    depth = int(sys.argv[1]) if len(sys.argv) > 1 else 7
+    unique_depth = int(sys.argv[2]) if len(sys.argv) > 2 else 9
+    processes = int(sys.argv[3]) if len(sys.argv) > 3 else None
+
+    if (NUMBER_OF_ROWS, NUMBER_OF_COLUMNS, NUMBER_TO_CONNECT) != (6, 7, 4):
+        print "the reference counts are only known for the standard board"
+        sys.exit(1)
+
+    if depth >= len(PERFT_RESULTS) or unique_depth >= len(UNIQUE_POSITIONS):
+        print "the reference counts are known up to depth %d and %d" % \
+              (len(PERFT_RESULTS) - 1, len(UNIQUE_POSITIONS) - 1)
+        sys.exit(1)
+
+    correct = True
+
+    for d in range(1, depth + 1):
+        t = time.time()
+        count = perft(Board(), d, PLAYER)
+        correct &= check("perft %d" % d, count, PERFT_RESULTS[d], time.time() - t)
+
+    t = time.time()
+    count = perft_parallel(Board(), depth, PLAYER, processes)
+    correct &= check("parallel", count, PERFT_RESULTS[depth], time.time() - t)
+
+    for d in range(1, unique_depth + 1):
+        t = time.time()
+        count = perft_unique(Board(), d, PLAYER)
+        correct &= check("unique %d" % d, count, UNIQUE_POSITIONS[d], time.time() - t)
+
+    if not correct:
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,51 @@
+#####
+# Reports the peak resident memory and the speed of the alpha-beta search on the benchmark position
+# Usage: python -m benchmarks.search_memory [time in milliseconds]
+#####
+
+import resource
+import sys
+import time
+from connectfour.AIManager import AIManager
+from connectfour.GameplayStatics import *
+from benchmarks.board_speed import benchmark_position
+
+
+def peak_rss():
+    """ Returns the peak resident memory of this process in megabytes
+    """
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024.0
+
+
+def main():
+    time_limit = int(sys.argv[1]) if len(sys.argv) > 1 else TIME_TO_MOVE
+
+    board, player = benchmark_position()
+
+    # Count the visited nodes
+    counter = [0]
+    original = AIManager.alpha_beta
+
+    def counting_alpha_beta(*args):
+        counter[0] += 1
+        return original(*args)
+
+    AIManager.alpha_beta = counting_alpha_beta
+
+    before = peak_rss()
+    t = time.time()
+
+    move = AIManager.make_alpha_beta_move(board, AIManager.basic_evaluate, player, time_limit=time_limit)
+
+    t = time.time() - t
+    after = peak_rss()
+
+    AIManager.alpha_beta = original
+
+    print "move %d at depth %d: %d nodes in %.2f s, %d nodes/s" % \
+          (move, AIManager.completed_depth, counter[0], t, counter[0] / t)
+    print "peak RSS %.1f MB (%.1f MB at start)" % (after, before)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,49 @@
+#####
+# Counts the nodes the iterative-deepening alpha-beta search visits to reach growing depths
+# on the fixed suite of middlegame positions, every search starting with an empty transposition table,
+# and the part of the cutoffs caused by the first move searched, which tells how good the move ordering is
+# Usage: python -m benchmarks.search_nodes [max depth]
+#####
+
+import sys
+import time
+from connectfour.AIManager import AIManager
+from connectfour.AIManager.TimeManager import TimeManager
+from connectfour.GameplayStatics import *
+from benchmarks.parallel_search import suite_positions
+
+
+def count_nodes(board, player, depth):
+    """ Returns the amount of nodes visited by the search of the given board to the given depth,
+    the amount of cutoffs and the amount of cutoffs caused by the first move searched
+    """
+    AIManager.transposition_table.clear()
+    AIManager.reset()
+    AIManager.nodes = 0
+
+    root_moves = [x for x in AIManager.CENTRE_ORDER if board.is_move_legal(x)]
+
+    AIManager.iterative_deepening(board, AIManager.basic_evaluate, player, depth, TimeManager(INF), root_moves)
+
+    return AIManager.nodes, AIManager.cutoffs, AIManager.first_move_cutoffs
+
+
+def main():
+    max_depth = int(sys.argv[1]) if len(sys.argv) > 1 else 10
+
+    positions = suite_positions()
+
+    print "depth      nodes    time  first move cutoffs"
+
+    for depth in range(1, max_depth + 1):
+        t = time.time()
+        counts = [count_nodes(board, player, depth) for board, player in positions]
+        t = time.time() - t
+
+        nodes, cutoffs, first_move_cutoffs = [sum(column) for column in zip(*counts)]
+
+        print "%5d %10d %6.2f s  %5.1f%%" % (depth, nodes, t, 100.0 * first_move_cutoffs / max(cutoffs, 1))
+
+
+if __name__ == '__main__':
+    main()
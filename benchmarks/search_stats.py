@@ -0,0 +1,59 @@
+#####
+# Measures the cost of the search statistics: the fixed suite is searched to a fixed depth with the cutoffs
+# counted, without counting them and with a callback reading the principal variation after every iteration
+# Usage: python -m benchmarks.search_stats [depth] [repetitions]
+#####
+
+import sys
+import time
+from connectfour.AIManager import AIManager
+from connectfour.AIManager.TimeManager import TimeManager
+from connectfour.GameplayStatics import *
+from benchmarks.parallel_search import suite_positions
+
+
+def time_suite(depth, repetitions, on_iteration=None):
+    """ Returns the shortest of the times it takes to search the whole suite to the given depth
+    """
+    best = None
+
+    for i in range(repetitions):
+        t = time.time()
+
+        for board, player in suite_positions():
+            AIManager.transposition_table.clear()
+            AIManager.reset()
+
+            root_moves = [x for x in AIManager.CENTRE_ORDER if board.is_move_legal(x)]
+
+            AIManager.iterative_deepening(board, AIManager.basic_evaluate, player, depth, TimeManager(INF),
+                                          root_moves, on_iteration=on_iteration)
+
+        t = time.time() - t
+
+        if best is None or t < best:
+            best = t
+
+    return best
+
+
+def main():
+    depth = int(sys.argv[1]) if len(sys.argv) > 1 else 10
+    repetitions = int(sys.argv[2]) if len(sys.argv) > 2 else 3
+
+    AIManager.set_stats_counting(False)
+    uncounted = time_suite(depth, repetitions)
+
+    AIManager.set_stats_counting(True)
+    counted = time_suite(depth, repetitions)
+
+    reported = time_suite(depth, repetitions, on_iteration=lambda stats: None)
+
+    print "depth %d, best of %d" % (depth, repetitions)
+    print "not counted:             %6.2f s" % uncounted
+    print "counted:                 %6.2f s  %+5.1f%%" % (counted, 100 * (counted / uncounted - 1))
+    print "counted, with callback:  %6.2f s  %+5.1f%%" % (reported, 100 * (reported / uncounted - 1))
+
+
+if __name__ == '__main__':
+    main()
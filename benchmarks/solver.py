@@ -0,0 +1,70 @@
+#####
+# Solves the positions from solver_positions.txt, checks the scores and reports the time and nodes per second
+# Usage: python -m benchmarks.solver
+#####
+
+import os
+import time
+from connectfour.AIManager import Solver
+from connectfour.LevelManager.Board import Board
+from connectfour.GameplayStatics import *
+
+# File with the benchmark positions and their known scores
+POSITIONS_FILE = os.path.join(os.path.dirname(__file__), 'solver_positions.txt')
+
+
+def load_positions():
+    """ Returns a list of (moves, board, player to move, score) read from the positions file
+    """
+    positions = []
+
+    for line in open(POSITIONS_FILE):
+        if line.startswith('#') or not line.strip():
+            continue
+
+        moves, score = line.split()
+
+        board = Board()
+        player = PLAYER
+
+        for move in moves:
+            board = board.make_move(int(move) - 1, player)
+            player = AI if player == PLAYER else PLAYER
+
+        positions.append((moves, board, player, int(score)))
+
+    return positions
+
+
+def main():
+    positions = load_positions()
+
+    # Group the results by the amount of empty places
+    groups = {}
+
+    for moves, board, player, score in positions:
+        # Solve every position from scratch
+        Solver.table_values[:] = Solver.array('B', [0]) * Solver.TABLE_SIZE
+
+        t = time.time()
+        result = Solver.solve_board(board, player, INF)
+        elapsed = time.time() - t
+
+        if result != score:
+            raise AssertionError("position " + moves + " solved as " + str(result) + ", expected " + str(score))
+
+        empty = board.count_empty_places()
+        total_time, total_nodes, amount = groups.get(empty, (0.0, 0, 0))
+        groups[empty] = (total_time + elapsed, total_nodes + Solver.nodes, amount + 1)
+
+    print "empty  positions  mean time  mean nodes    nodes/s"
+
+    for empty in sorted(groups):
+        total_time, total_nodes, amount = groups[empty]
+
+        print "%5d  %9d  %8.2fs  %10d  %9d" % (empty, amount, total_time / amount, total_nodes / amount,
+                                               total_nodes / max(total_time, 1e-9))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,99 @@
+#####
+# Measures the startup cost of the Board module: the generation of its Zobrist hash values, compared with the
+# previous one setting every bit with randint(0, 1), and the time fresh processes take to import it
+# Every process must compute the same hash values as this one, or the opening book and the tables shared between
+# the search processes would be keyed by different hashes
+# Usage: python -m benchmarks.startup [processes]
+#####
+
+import random
+import subprocess
+import sys
+import time
+from connectfour.LevelManager.Board import Board
+from connectfour.GameplayStatics import *
+
+# Moves leading to the position whose hash is compared between the processes
+HASHED_MOVES = [3, 3, 2, 4]
+
+# Code run by the fresh processes, prints the import time of the Board module in milliseconds
+# and the hash of the position after HASHED_MOVES
+IMPORT_CODE = """
+import time
+t = time.time()
+from connectfour.LevelManager.Board import Board
+t = time.time() - t
+board = Board()
+for i, move in enumerate(%r):
+    board.play(move, 'O' if i %% 2 == 0 else 'X')
+print t * 1000
+print board.hash
+""" % HASHED_MOVES
+
+
+def randint_random_numbers(count, n):
+    """ The previous generation of the hash values, setting every bit of every number with randint(0, 1)
+    """
+    hash_random = random.Random(ZOBRIST_SEED)
+    numbers = []
+
+    for i in range(count):
+        pot = 1
+        l = 0
+
+        for j in range(n):
+            l += pot * hash_random.randint(0, 1)
+            pot *= 2
+
+        numbers.append(l)
+
+    return numbers
+
+
+def main():
+    processes = int(sys.argv[1]) if len(sys.argv) > 1 else 10
+
+    count = 2 * NUMBER_OF_ROWS * NUMBER_OF_COLUMNS
+
+    t = time.time()
+    randint_random_numbers(count, 64)
+    randint_time = time.time() - t
+
+    t = time.time()
+    hash_random = random.Random(ZOBRIST_SEED)
+    numbers = [hash_random.getrandbits(64) for i in range(count)]
+    getrandbits_time = time.time() - t
+
+    print "hash values, randint:     %7.2f ms" % (randint_time * 1000)
+    print "hash values, getrandbits: %7.2f ms" % (getrandbits_time * 1000)
+
+    # The hash of the position in this process, the other processes must agree with it
+    board = Board()
+
+    for i, move in enumerate(HASHED_MOVES):
+        board.play(move, PLAYER if i % 2 == 0 else AI)
+
+    import_times = []
+    hashes = set([str(board.hash)])
+
+    t = time.time()
+
+    for i in range(processes):
+        output = subprocess.check_output([sys.executable, '-c', IMPORT_CODE]).split('\n')
+
+        import_times.append(float(output[0]))
+        hashes.add(output[1])
+
+    t = time.time() - t
+
+    print "process spawn:            %7.2f ms per process, Board import best %.2f ms, worst %.2f ms" % \
+          (t * 1000 / processes, min(import_times), max(import_times))
+    print "hash of the same position in this and %d other processes: %s" % \
+          (processes, "the same" if len(hashes) == 1 else "%d DIFFERENT VALUES" % len(hashes))
+
+    if len(hashes) != 1:
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
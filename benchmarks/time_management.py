@@ -0,0 +1,52 @@
+#####
+# Plays a game of the alpha-beta search against itself, both sides on their own game clock, and reports
+# the time given to every move, the time it took and the depth reached
+# Usage: python -m benchmarks.time_management [game time in milliseconds] [increment in milliseconds]
+#####
+
+import sys
+from connectfour.AIManager import AIManager
+from connectfour.AIManager.TimeManager import GameClock, clock
+from connectfour.LevelManager.Board import Board
+from connectfour.GameplayStatics import *
+
+
+def main():
+    game_time = int(sys.argv[1]) if len(sys.argv) > 1 else 60000
+    increment = int(sys.argv[2]) if len(sys.argv) > 2 else 0
+
+    clocks = {PLAYER: GameClock(game_time, increment), AI: GameClock(game_time, increment)}
+    moves = {PLAYER: 0, AI: 0}
+
+    board = Board()
+    player = PLAYER
+
+    print "%d ms per game, %d ms increment" % (game_time, increment)
+
+    while board.check_game_over() == OUTCOME_NOTHING:
+        AIManager.completed_depth = 0
+
+        time_limit = clocks[player].start_move(board)
+        t = clock()
+
+        move = AIManager.make_alpha_beta_move(board, AIManager.basic_evaluate, player, time_limit=time_limit)
+
+        used = (clock() - t) * 1000
+        clocks[player].stop_move()
+
+        print "%s plays %d: %6d ms given, %6d ms used, depth %2d, %6d ms left" % \
+              (player, move, time_limit, used, AIManager.completed_depth, clocks[player].remaining)
+
+        board.play(move, player)
+        moves[player] += 1
+        player = AI if player == PLAYER else PLAYER
+
+    print "outcome: " + board.check_game_over()
+
+    for side in (PLAYER, AI):
+        print "%s used %d ms in %d moves" % \
+              (side, game_time + increment * moves[side] - clocks[side].remaining, moves[side])
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,35 @@
+#####
+# Reports the transposition table hit rate, fill ratio and the peak resident memory for searches of growing length
+# Usage: python -m benchmarks.transposition_table [size in megabytes]
+#####
+
+import resource
+import sys
+from connectfour.AIManager import AIManager
+from connectfour.AIManager.TranspositionTable import TranspositionTable
+from connectfour.GameplayStatics import *
+from benchmarks.board_speed import benchmark_position
+
+# Lengths of the searches (in milliseconds)
+TIME_LIMITS = [1000, 2000, 5000, 10000]
+
+
+def main():
+    if len(sys.argv) > 1:
+        AIManager.transposition_table = TranspositionTable(int(sys.argv[1]))
+
+    table = AIManager.transposition_table
+    board, player = benchmark_position()
+
+    print "table of %d slots" % table.size
+
+    for time_limit in TIME_LIMITS:
+        AIManager.make_alpha_beta_move(board, AIManager.basic_evaluate, player, time_limit=time_limit)
+
+        print "%5d ms: hit rate %.3f, fill ratio %.3f, peak RSS %.1f MB" % \
+              (time_limit, table.hit_rate(), table.fill_ratio(),
+               resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024.0)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,52 @@
+#####
+# Compares the depth reached with a transposition table kept between moves against a table cleared before every move
+# The engine plays a few moves against itself from the benchmark position, then every position is searched again
+# with a cleared table
+# Usage: python -m benchmarks.warm_table [time in milliseconds] [moves]
+#####
+
+import sys
+from connectfour.AIManager import AIManager
+from connectfour.GameplayStatics import *
+from benchmarks.board_speed import benchmark_position
+
+
+def main():
+    time_limit = int(sys.argv[1]) if len(sys.argv) > 1 else TIME_TO_MOVE
+    moves = int(sys.argv[2]) if len(sys.argv) > 2 else 6
+
+    board, player = benchmark_position()
+
+    table = AIManager.transposition_table
+    table.clear()
+
+    positions = []
+    warm_depths = []
+
+    # Self-play with the table kept warm
+    for i in range(moves):
+        positions.append((board, player))
+
+        move = AIManager.make_alpha_beta_move(board, AIManager.basic_evaluate, player, time_limit=time_limit)
+        warm_depths.append(AIManager.completed_depth)
+
+        board = board.make_move(move, player)
+        player = AI if player == PLAYER else PLAYER
+
+        if board.check_game_over() != OUTCOME_NOTHING:
+            break
+
+    print "move  cold depth  warm depth"
+
+    # The same positions with a cleared table
+    for i in range(len(positions)):
+        board, player = positions[i]
+
+        table.clear()
+        AIManager.make_alpha_beta_move(board, AIManager.basic_evaluate, player, time_limit=time_limit)
+
+        print "%4d  %10d  %10d" % (i + 1, AIManager.completed_depth, warm_depths[i])
+
+
+if __name__ == '__main__':
+    main()
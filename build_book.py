@@ -0,0 +1,98 @@
+#####
+# Builds the opening book: searches every position up to the given ply with a fixed-depth alpha-beta search,
+# using all processor cores, and writes the best moves to the book file
+# Usage: python build_book.py [ply] [depth] [output file]
+#####
+
+import multiprocessing
+import sys
+import time
+from connectfour.AIManager import AIManager
+from connectfour.AIManager.OpeningBook import write_book, BOOK_PATH
+from connectfour.LevelManager.Board import Board
+from connectfour.GameplayStatics import *
+
+# Default book parameters
+BOOK_PLY = 4
+BOOK_DEPTH = 12
+
+
+def opening_positions(max_ply):
+    """ Returns move sequences leading to every distinct unfinished position with at most max_ply pieces
+    The Player always makes the first move
+    """
+    positions = [[]]
+    layer = {Board().hash: (Board(), [])}
+
+    for ply in range(max_ply):
+        player = PLAYER if ply % 2 == 0 else AI
+        next_layer = {}
+
+        for board, moves in layer.values():
+            for x in range(NUMBER_OF_COLUMNS):
+                if not board.is_move_legal(x):
+                    continue
+
+                child = board.make_move(x, player)
+
+                if child.hash not in next_layer and child.check_game_over() == OUTCOME_NOTHING:
+                    next_layer[child.hash] = (child, moves + [x])
+
+        positions.extend([moves for board, moves in next_layer.values()])
+        layer = next_layer
+
+    return positions
+
+
+def init_worker():
+    """ Prepares a worker process, the moves must come from searching and not from an older book
+    """
+    AIManager.opening_book.close()
+
+
+def search_position(task):
+    """ Searches the position reached by the given moves to a fixed depth, returns its hash and the best move
+    """
+    moves, depth = task
+
+    board = Board()
+    player = PLAYER
+
+    for x in moves:
+        board = board.make_move(x, player)
+        player = AI if player == PLAYER else PLAYER
+
+    move = AIManager.make_alpha_beta_move(board, AIManager.basic_evaluate, player, depth, time_limit=INF)
+
+    return board.hash, move
+
+
+def main():
+    ply = int(sys.argv[1]) if len(sys.argv) > 1 else BOOK_PLY
+    depth = int(sys.argv[2]) if len(sys.argv) > 2 else BOOK_DEPTH
+    path = sys.argv[3] if len(sys.argv) > 3 else BOOK_PATH
+
+    positions = opening_positions(ply)
+
+    print "searching %d positions to depth %d on %d processes" % (len(positions), depth, multiprocessing.cpu_count())
+
+    t = time.time()
+    pool = multiprocessing.Pool(initializer=init_worker)
+    entries = []
+
+    for entry in pool.imap_unordered(search_position, [(moves, depth) for moves in positions]):
+        entries.append(entry)
+
+        if len(entries) % 100 == 0:
+            print "%d/%d positions searched in %.0f s" % (len(entries), len(positions), time.time() - t)
+
+    pool.close()
+    pool.join()
+
+    write_book(path, entries)
+
+    print "book of %d positions written to %s in %.0f s" % (len(entries), path, time.time() - t)
+
+
+if __name__ == '__main__':
+    main()
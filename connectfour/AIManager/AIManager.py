@@ -4,306 +4,610 @@
 
 import random
 import math
-import time
 from connectfour.GameplayStatics import *
+from connectfour.AIManager.TranspositionTable import *
+from connectfour.AIManager.TimeManager import *
+from connectfour.AIManager.SearchStats import *
+from connectfour.AIManager.OpeningBook import *
+from connectfour.AIManager.Solver import make_solver_move
+from connectfour.LevelManager.Board import COLUMN_HEIGHT
 
-# Alpha-beta search
+# Alpha-beta search, working on a single board with play() and undo()
 
+# Killer heuristic: the two latest moves that caused a cutoff at every ply, kept between iterations
+killer = []
+
+# History heuristic: how often and how deep the moves to every place caused a cutoff, for both players,
+# kept between iterations and aged between moves
+history = []
+
+# The amounts of cutoffs and of cutoffs caused by the first move searched, since the latest search started,
+# only counted while counting is switched on
+cutoffs = 0
+first_move_cutoffs = 0
+
+# The statistics of the latest search, as of its last completed iteration
+search_stats = SearchStats()
+
+# Transposition table, kept between moves and games
+transposition_table = TranspositionTable(TRANSPOSITION_TABLE_SIZE)
+
+# The depth of the deepest iteration completed by the latest search
+completed_depth = 0
+
+# Setting this flag from another thread stops the running search as if its time has run out
+search_stopped = False
+
+# The amount of nodes visited by alpha_beta, the clock is checked only once in a while
+nodes = 0
 
-class Vertex:
-    """ Class for a game tree vertex, used in alpha_beta search
+# The AI's clock for the current game
+game_clock = GameClock()
+
+# Precomputed moves for the opening positions, empty if there is no book file
+opening_book = OpeningBook(BOOK_PATH)
+
+
+class SearchTimeout(Exception):
+    """ Raised inside the alpha-beta search when its time runs out or it is stopped
     """
+    pass
 
-    def __init__(self, prev_value, num, board, move):
-        # The estimated value of the node based on evaluation function or previous searches
-        self.prev_value = prev_value
 
-        # The number of the vertex
-        self.num = num
+def get_book_move(board):
+    """ Returns the opening book move for the given board, or None if the board is not in the book
+    """
+    move = opening_book.lookup(board.hash)
 
-        # The board associated with this vertex
-        self.board = board
+    if move is None or not board.is_move_legal(move):
+        return None
 
-        # The move that was performed to get to this vertex
-        self.move = move
+    if DEBUG:
+        print "book move " + str(move)
 
-        # How far from the deepest end-node are we
-        self.max_moves = 0
+    return move
 
-        # Was this vertex expanded and its child moves generated
-        self.expanded = False
 
+def get_solver_move(board, player, time_limit):
+    """ Returns the perfect move for the given board if it can be found within time_limit milliseconds, otherwise None
+    """
+    return make_solver_move(board, player, time_limit, lambda: search_stopped)
 
-# The game tree
-G = []
 
-# Killer heuristic
-killer = []
+def get_shortcut_move(board, player, time_limit):
+    """ Returns a move for the given board that needs no search, or None if there is none, and the time left
+    for the search out of time_limit milliseconds
+    The move comes from the opening book, is the only legal one or is the perfect move found by the solver
+    near the end of the game, which may take half of the time, elsewhere the search gets all of it
+    """
+    # Positions from the opening book need no search
+    book_move = get_book_move(board)
 
-# Transposition table
-transposition_table = {}
+    if book_move is not None:
+        return book_move, time_limit
 
+    legal_moves = [x for x in range(NUMBER_OF_COLUMNS) if board.is_move_legal(x)]
 
-class tt_entry:
-    """A plain data type for transposition table entry"""
+    # A forced move needs no search
+    if len(legal_moves) == 1:
+        return legal_moves[0], time_limit
 
-    def __init__(self, entry_type, value, depth, max_moves):
-        # Type of the entry - 'exact', 'upper', 'lower'
-        self.type = entry_type
+    # Near the end of the game try to find the perfect move, using at most half of the time
+    if board.count_empty_places() < SOLVER_THRESHOLD:
+        solver_move = get_solver_move(board, player, time_limit / 2)
 
-        # Values associated with the entry
-        self.value = value
-        self.max_moves = max_moves
+        if solver_move is not None:
+            return solver_move, time_limit
 
-        # Depth of the entry vertex
-        self.depth = depth
+        time_limit -= time_limit / 2
 
+    return None, time_limit
 
-def add_entry(h, alpha, beta, value, depth, max_moves):
-    """Produce and add an entry with the given hash to the transposition table"""
-    entry = tt_entry('exact', value, depth, max_moves)
 
+def add_entry(h, alpha, beta, value, depth, max_moves, move):
+    """Produce and add an entry with the given hash to the transposition table
+    A value at most alpha is only an upper bound of the real value, a value at least beta is only a lower bound
+    """
     if value <= alpha:
-        tt_entry.type = 'lower'
+        entry_type = ENTRY_UPPER
     elif value >= beta:
-        tt_entry.type = 'upper'
+        entry_type = ENTRY_LOWER
+    else:
+        entry_type = ENTRY_EXACT
 
-    transposition_table[h] = entry
+    transposition_table.store(h, entry_type, value, depth, max_moves, move)
 
 
-def alpha_beta_order_moves(children, depth, player):
-    """Order the moves in the best possible way - killer move first, rest sorted by values of previous searches"""
-    without_killer = []
-    new_children = []
+# Columns ordered from the centre outwards, the centre ones take part in the most lines
+CENTRE_ORDER = sorted(range(NUMBER_OF_COLUMNS), key=lambda x: abs(2 * x - NUMBER_OF_COLUMNS + 1))
 
-    for child in children:
-        if child.move != killer[depth]:
-            without_killer.append(child)
-        else:
-            new_children.append(child)
 
-    if player == PLAYER:
-        without_killer.sort(key=lambda vertex: -vertex.prev_value)
-    else:
-        without_killer.sort(key=lambda vertex: vertex.prev_value)
+def clear_killers():
+    """ Clears the killer moves of all plies
+    """
+    global killer
+
+    killer = [[-1, -1] for x in range(NUMBER_OF_COLUMNS * NUMBER_OF_ROWS + 2)]
+
 
-    for child in without_killer:
-        new_children.append(child)
+def age_history(searches=1):
+    """ Halves the history once for every given search, so that it still orders the moves but gives way to what
+    the new search learns
+    """
+    global history
 
-    return new_children
+    if not history:
+        history = [[0 for x in range(NUMBER_OF_COLUMNS * COLUMN_HEIGHT)] for player in (PLAYER, AI)]
+    elif searches > 0:
+        history = [[value >> searches for value in player_history] for player_history in history]
 
 
-def alpha_beta(v, depth, alpha, beta, player, evaluate, start_clock):
-    """ Recursive alpha-beta algorithm that terminates after a set time has passed since the start_clock
+def new_move_ordering():
+    """ Prepares the move ordering tables for a new search: the killer moves are cleared and the history is aged
     """
+    global cutoffs, first_move_cutoffs
 
-    # If we have used all available time, terminate the search
-    if (time.clock() - start_clock) * 1000 >= TIME_TO_MOVE:
-        return 0
+    clear_killers()
+    age_history()
 
-    # Get the entry for current board, determine if we can use it
-    h = v.board.hash
-    entry = transposition_table.get(h)
+    cutoffs = 0
+    first_move_cutoffs = 0
 
-    if entry is not None and entry.depth >= depth:
-        if entry.type == 'exact':
-            v.prev_value = entry.value
-            v.max_moves = entry.max_moves
 
-            return entry.value
-        elif entry.type == 'upper':
-            beta = min(entry.value, beta)
-        else:
-            alpha = max(entry.value, alpha)
+def ordered_moves(board, hash_move, ply_killer, player_history):
+    """ Yields the legal moves on the board in the order they should be searched: the best move stored in the
+    transposition table, the two killer moves of the ply, then the other moves by their history and among moves
+    with equal history from the centre outwards
+    The other moves are only ordered if none of the first ones caused a cutoff and there is a history to order
+    them by, otherwise they are searched from the centre outwards
+    """
+    first = []
 
-        if beta <= alpha:
-            v.prev_value = entry.value
-            v.max_moves = entry.max_moves
+    for x in (hash_move, ply_killer[0], ply_killer[1]):
+        if x != -1 and x not in first and board.is_move_legal(x):
+            first.append(x)
 
-            return entry.value
+            yield x
 
-    # Copy the original alpha-beta values
-    original_alpha = alpha
-    original_beta = beta
+    rest = [x for x in CENTRE_ORDER if x not in first and board.is_move_legal(x)]
 
-    # If we have reached the desired tree depth, return static evaluation value of this node
-    if depth == 0:
-        value = evaluate(v.board)
+    # The sort is stable, so the centre order decides between moves with equal history
+    if player_history is not None:
+        rest.sort(key=lambda x: player_history[x * COLUMN_HEIGHT + board.get_counter(x)], reverse=True)
 
-        v.prev_value = value
+    for x in rest:
+        yield x
 
-        add_entry(h, original_alpha, original_beta, value, depth, v.max_moves)
 
-        return value
+def add_cutoff(board, x, player, depth, ply, *_):
+    """ Records that the move x of the player caused a cutoff at the given ply
+    The move becomes the first killer move of the ply and its history grows with the depth of the search
+    Whether the move was the first one searched only matters to add_counted_cutoff, it is ignored here
+    """
+    ply_killer = killer[ply]
 
-    # If this node is an end-node, assign a static evaluation value to it and make sure we will never visit it again
-    if not v.expanded and v.board.check_game_over() != OUTCOME_NOTHING:
-        value = evaluate(v.board)
+    if ply_killer[0] != x:
+        ply_killer[1] = ply_killer[0]
+        ply_killer[0] = x
 
-        v.prev_value = value
-        v.expanded = True
+    # The piece of the move has already been taken back, so it lands on the first empty place of the column
+    history[0 if player == PLAYER else 1][x * COLUMN_HEIGHT + board.get_counter(x)] += depth * depth
 
-        add_entry(h, original_alpha, original_beta, value, depth, v.max_moves)
 
-        return value
+def add_counted_cutoff(board, x, player, depth, ply, first):
+    """ Records the cutoff like add_cutoff and counts it for the search statistics, first tells if the move was
+    the first one searched at the ply
+    """
+    global cutoffs, first_move_cutoffs
 
-    # If this node has been expanded, so its children have prev_values assigned, sort them in the optimal order
-    # If the node has not been expanded yet, generate its child moves
-    if v.expanded:
-        G[v.num] = alpha_beta_order_moves(G[v.num], depth, player)
-    else:
-        for x in range(NUMBER_OF_COLUMNS):
-            if v.board.is_move_legal(x):
-                new_v = Vertex(0, len(G), v.board.make_move(x, player), x)
-                G.append([])
-                G[v.num].append(new_v)
+    cutoffs += 1
+
+    if first:
+        first_move_cutoffs += 1
+
+    add_cutoff(board, x, player, depth, ply)
+
+
+# The function alpha_beta records its cutoffs with, it is replaced to switch counting them on or off
+record_cutoff = add_counted_cutoff
+
+
+def set_stats_counting(enabled):
+    """ Switches counting the cutoffs on or off, the search does not check whether it should count,
+    so a search that does not count pays nothing for it
+    Nodes are always counted, they tell the search when to read the clock
+    """
+    global record_cutoff
+
+    record_cutoff = add_counted_cutoff if enabled else add_cutoff
+
+
+def principal_variation(board, player, length):
+    """ Returns at most length moves that both players are expected to play on the given board, starting with
+    the given player, read from the best moves stored in the transposition table
+    """
+    board = board.copy()
+    moves = []
+
+    while len(moves) < length and board.check_game_over() == OUTCOME_NOTHING:
+        h = board.hash
+        mirrored = board.mirror_hash < h
+
+        if mirrored:
+            h = board.mirror_hash
+
+        entry = transposition_table.probe(h)
+
+        # The best move is the last part of the entry
+        if entry is None or entry[4] == -1:
+            break
+
+        move = entry[4]
+
+        if mirrored:
+            move = NUMBER_OF_COLUMNS - 1 - move
+
+        if not board.is_move_legal(move):
+            break
+
+        moves.append(move)
+        board.play(move, player)
+        player = AI if player == PLAYER else PLAYER
+
+    return moves
+
+
+# Half of the width of the aspiration window around the value expected from an iteration
+ASPIRATION_WINDOW = 4
+
+# How far from the deepest end-node is the vertex at the given ply, filled in by alpha_beta
+ply_max_moves = [0 for x in range(NUMBER_OF_COLUMNS * NUMBER_OF_ROWS + 2)]
+
+
+def alpha_beta(board, depth, ply, alpha, beta, player, evaluate, deadline):
+    """ Recursive alpha-beta algorithm working on one shared board, raises SearchTimeout once the clock reaches
+    the deadline or the search is stopped
+    Every move is played on the board and undone before returning, so the board is left unchanged,
+    unless the search times out: the pieces played on the way down are then left on the board
+    Nothing is kept between the nodes apart from the transposition table: the best move of every searched position
+    is stored there and tried first when the position is searched again, the distances to the deepest end-nodes
+    are passed to the parent through ply_max_moves
+    The evaluate function must give a position and its mirror image the same value, as they share their entry
+    """
 
-        v.expanded = True
+    global nodes
+
+    nodes += 1
+
+    # Reading the clock takes longer than a node, so it is done once per NODES_PER_CLOCK_CHECK nodes
+    # The search unwinds with an exception, so that no unfinished node returns a value or stores it in the table
+    if nodes & (NODES_PER_CLOCK_CHECK - 1) == 0 and (search_stopped or clock() >= deadline):
+        raise SearchTimeout()
+
+    # A position and its mirror image have the same value, so both are stored under the smaller of their hashes,
+    # the best move is stored as played on the board with that hash and mirrored for the other one
+    h = board.hash
+    mirrored = board.mirror_hash < h
+
+    if mirrored:
+        h = board.mirror_hash
+
+    # Get the entry for current board, determine if we can use it
+    # Only the copy of the entry returned by the table is read, the table itself can change in the meantime
+    entry = transposition_table.probe(h)
+    hash_move = -1
+
+    if entry is not None:
+        entry_value, entry_type, entry_depth, entry_max_moves, hash_move = entry
+
+        # Even an entry too shallow to use tells which move was the best one
+        if mirrored and hash_move != -1:
+            hash_move = NUMBER_OF_COLUMNS - 1 - hash_move
+
+        if entry_depth >= depth:
+            if entry_type == ENTRY_EXACT:
+                ply_max_moves[ply] = entry_max_moves
+
+                return entry_value
+            elif entry_type == ENTRY_UPPER:
+                beta = min(entry_value, beta)
+            else:
+                alpha = max(entry_value, alpha)
+
+            if beta <= alpha:
+                ply_max_moves[ply] = entry_max_moves
+
+                return entry_value
+
+    # Copy the original alpha-beta values
+    original_alpha = alpha
+    original_beta = beta
+
+    # If we have reached the desired tree depth or this node is an end-node, return its static evaluation value
+    if depth == 0 or board.check_game_over() != OUTCOME_NOTHING:
+        value = evaluate(board)
+
+        ply_max_moves[ply] = 0
+
+        add_entry(h, original_alpha, original_beta, value, depth, 0, -1)
+
+        return value
+
+    max_moves = 0
+    best_move = -1
 
     # If we are the maximising player
     if player == PLAYER:
         value = -INF
 
-        # For each child recurse down the tree and update our alpha and current values
-        for child in G[v.num]:
-            new_value = alpha_beta(child, depth - 1, alpha, beta, AI, evaluate, start_clock)
+        # Right above the end-nodes ordering the moves by their history costs more time than it saves
+        # For each legal move recurse down the tree and update our alpha and current values
+        for x in ordered_moves(board, hash_move, killer[ply], history[0] if depth > 2 else None):
+            board.play(x, player)
+
+            # Principal variation search: the first move is most likely the best one, the others are only
+            # checked with a null window to prove they are not better and searched again if they are
+            if best_move == -1:
+                first_move = x
+                new_value = alpha_beta(board, depth - 1, ply + 1, alpha, beta, AI, evaluate, deadline)
+            else:
+                new_value = alpha_beta(board, depth - 1, ply + 1, alpha, alpha + 1, AI, evaluate, deadline)
 
-            if new_value > value:
+                if alpha < new_value < beta:
+                    new_value = alpha_beta(board, depth - 1, ply + 1, new_value, beta, AI, evaluate, deadline)
+
+            board.undo(x)
+
+            if new_value > value or best_move == -1:
                 value = new_value
-                v.max_moves = child.max_moves + 1
+                max_moves = ply_max_moves[ply + 1] + 1
+                best_move = x
             elif new_value == value:
-                v.max_moves = max(v.max_moves, child.max_moves + 1)
+                max_moves = max(max_moves, ply_max_moves[ply + 1] + 1)
 
             alpha = max(alpha, value)
 
             # Alpha cutoff
             if beta <= alpha:
-                v.prev_value = value
-
-                # A move that caused a cutoff becomes the new killer move
-                killer[depth] = child.move
-
-                add_entry(h, original_alpha, original_beta, value, depth, v.max_moves)
-
-                return value
+                record_cutoff(board, x, player, depth, ply, x == first_move)
+                break
     # If we are the minimising player
     else:
         value = INF
 
-        # For each child recurse down the tree and update our beta and current values
-        for child in G[v.num]:
-            new_value = alpha_beta(child, depth - 1, alpha, beta, PLAYER, evaluate, start_clock)
+        # For each legal move recurse down the tree and update our beta and current values
+        for x in ordered_moves(board, hash_move, killer[ply], history[1] if depth > 2 else None):
+            board.play(x, player)
+
+            # Principal variation search, as for the maximising player
+            if best_move == -1:
+                first_move = x
+                new_value = alpha_beta(board, depth - 1, ply + 1, alpha, beta, PLAYER, evaluate, deadline)
+            else:
+                new_value = alpha_beta(board, depth - 1, ply + 1, beta - 1, beta, PLAYER, evaluate, deadline)
+
+                if alpha < new_value < beta:
+                    new_value = alpha_beta(board, depth - 1, ply + 1, alpha, new_value, PLAYER, evaluate, deadline)
 
-            if new_value < value:
+            board.undo(x)
+
+            if new_value < value or best_move == -1:
                 value = new_value
-                v.max_moves = child.max_moves + 1
+                max_moves = ply_max_moves[ply + 1] + 1
+                best_move = x
             elif new_value == value:
-                v.max_moves = max(v.max_moves, child.max_moves + 1)
+                max_moves = max(max_moves, ply_max_moves[ply + 1] + 1)
 
             beta = min(beta, value)
-            v.max_moves = max(v.max_moves, child.max_moves + 1)
 
             # Beta cutoff
             if beta <= alpha:
-                v.prev_value = value
-
-                # A move that caused a cutoff becomes the new killer move
-                killer[depth] = child.move
-
-                add_entry(h, original_alpha, original_beta, value, depth, v.max_moves)
+                record_cutoff(board, x, player, depth, ply, x == first_move)
+                break
 
-                return value
+    ply_max_moves[ply] = max_moves
 
-    v.prev_value = value
+    if mirrored:
+        best_move = NUMBER_OF_COLUMNS - 1 - best_move
 
-    add_entry(h, original_alpha, original_beta, value, depth, v.max_moves)
+    add_entry(h, original_alpha, original_beta, value, depth, max_moves, best_move)
 
     return value
 
 
-def make_alpha_beta_move(board, evaluate, player, depth=NUMBER_OF_COLUMNS * NUMBER_OF_ROWS):
+def make_alpha_beta_move(board, evaluate, player, depth=NUMBER_OF_COLUMNS * NUMBER_OF_ROWS,
+                         time_limit=TIME_TO_MOVE, on_iteration=None):
     """ Performs alpha-beta search to find the best possible move using the given evaluate function
+    The given board is not changed, the search works on its own copy
+    The search takes at most time_limit milliseconds
+    If on_iteration is given, it is called with the SearchStats of every completed iteration, including
+    the principal variation
     """
-    global G, killer, transposition_table
+    # Book moves, forced moves and solved positions need no search
+    shortcut_move, time_limit = get_shortcut_move(board, player, time_limit)
 
-    # Clear the game tree
-    G = []
-    transposition_table = {}
+    if shortcut_move is not None:
+        return shortcut_move
 
-    # Create a root
-    root = Vertex(0, 0, board, 0)
-    G.append([])
+    root_moves = [x for x in CENTRE_ORDER if board.is_move_legal(x)]
 
-    # Make sure we always look through the next moves we can take
-    if transposition_table.get(root.board.hash) is not None:
-        transposition_table[root.board.hash] = None
+    # The transposition table is kept, its entries from the previous searches are still valid
+    transposition_table.new_search()
 
     # Set up the timer
-    t = time.clock()
+    time_manager = TimeManager(time_limit)
+
+    # A bit of randomness can prove you no wrong: the root moves are searched in a random order,
+    # so that the first one found among equally good moves differs from game to game
+    random.shuffle(root_moves)
+
+    best = iterative_deepening(board, evaluate, player, depth, time_manager, root_moves, on_iteration=on_iteration)
+
+    if DEBUG:
+        print "move found in " + str(time_manager.elapsed() * 1000)
+        print "transposition table hit rate = " + str(transposition_table.hit_rate()) + \
+              ", fill ratio = " + str(transposition_table.fill_ratio())
+        print "first move cutoff rate = " + str(search_stats.first_move_cutoff_rate())
+
+    return best
+
+
+def iterative_deepening(board, evaluate, player, depth, time_manager, root_moves, first_depth=0, on_iteration=None):
+    """ Runs the alpha-beta search on a copy of the given board with growing depths, starting with
+    first_depth + 1, until it reaches the given depth, the time manager stops it or the search is stopped
+    The root moves are searched in the given order, the best one of the previous iteration is moved to the front
+    Returns the best move of the last completed iteration, or the best move of an unfinished iteration if it
+    has already beaten that one, or None if no move was searched to the end
+    The depth of the last completed iteration is left in completed_depth and its statistics in search_stats,
+    on_iteration is called with the statistics and the principal variation after every completed iteration
+    """
+    global completed_depth, search_stats
+
+    completed_depth = 0
+    search_stats = SearchStats()
+
+    new_move_ordering()
+
+    # The counters are shared with the other searches, so only their growth belongs to this one
+    start_nodes = nodes
+    start_probes = transposition_table.probes
+    start_hits = transposition_table.hits
+
+    # The one board shared by the whole search
+    board = board.copy()
+
+    opponent = AI if player == PLAYER else PLAYER
 
     best = None
+    root_moves = list(root_moves)
+
+    # The values of the completed iterations
+    values = []
 
     # Iterative deepening
-    for d in range(depth):
+    for d in range(first_depth, depth):
 
-        # If we have exceeded our time, terminate
-        if (time.clock() - t) * 1000 >= TIME_TO_MOVE:
+        # If the search was stopped or the next iteration is not worth starting, terminate
+        if search_stopped or not time_manager.can_start_iteration():
             break
 
-        # Reset the killer heuristic table
-        killer = [-1 for x in range(NUMBER_OF_COLUMNS * NUMBER_OF_ROWS + 1)]
+        # Aspiration window: a narrow window around the expected value lets the search cut off more of the tree
+        # The value swings between odd and even depths, as the player who makes the last move in the search
+        # gets the last threat in, so the value two iterations back is expected rather than the previous one
+        if len(values) < 2:
+            window_alpha = -2 * INF
+            window_beta = 2 * INF
+        else:
+            window_alpha = values[-2] - ASPIRATION_WINDOW
+            window_beta = values[-2] + ASPIRATION_WINDOW
+
+        timed_out = False
+
+        # A value outside of the window is only a bound, the search is then repeated with the window
+        # opened on that side
+        while True:
+            iteration_best = None
+            best_value = 0
+            best_max_moves = 0
+            best_exact = False
+            alpha = window_alpha
+            beta = window_beta
+
+            # Search every root move, among moves with equal exact values choose the one that has more moves
+            # until the end
+            try:
+                for x in root_moves:
+                    board.play(x, player)
+                    value = alpha_beta(board, d, 1, alpha, beta, opponent, evaluate, time_manager.deadline)
+                    board.undo(x)
+
+                    max_moves = ply_max_moves[1]
+
+                    # A value on or outside of the bounds it was searched with is only a bound, two equal bounds
+                    # tell nothing about which move is better, so the first move found is kept
+                    exact = alpha < value < beta
+                    tie_break = exact and best_exact and max_moves > best_max_moves
+
+                    if player == PLAYER:
+                        if iteration_best is None or value > best_value or (value == best_value and tie_break):
+                            iteration_best = x
+                            best_value = value
+                            best_max_moves = max_moves
+                            best_exact = exact
+                            alpha = max(alpha, value)
+                    else:
+                        if iteration_best is None or value < best_value or (value == best_value and tie_break):
+                            iteration_best = x
+                            best_value = value
+                            best_max_moves = max_moves
+                            best_exact = exact
+                            beta = min(beta, value)
+
+                    # The value is outside of the window, the search is repeated anyway
+                    if beta <= alpha:
+                        break
+            except SearchTimeout:
+                # The previous best move is searched first, so once it is done any move chosen over it
+                # has beaten it at the deeper depth, unless it was compared only by bounds from outside the window
+                if iteration_best is not None and \
+                        (best is None or (best_value > window_alpha if player == PLAYER else best_value < window_beta)):
+                    best = iteration_best
+
+                timed_out = True
+                break
+
+            if best_value <= window_alpha and window_alpha > -2 * INF:
+                window_alpha = -2 * INF
+            elif best_value >= window_beta and window_beta < 2 * INF:
+                window_beta = 2 * INF
+            else:
+                break
+
+        # The board is left unusable and the search ends
+        if timed_out:
+            break
 
-        # Perform a full alpha-beta pass until we reach the desired depth, all nodes are explored or time runs out
-        alpha_beta(root, d + 1, -2 * INF, 2 * INF, player, evaluate, t)
+        completed_depth = d + 1
+        best = iteration_best
+        value = best_value
+        values.append(value)
 
-        # If we terminated the d-depth search early, there is no use to update our best move, so terminate
-        if (time.clock() - t) * 1000 >= TIME_TO_MOVE:
-            break
+        root_moves.remove(best)
+        root_moves.insert(0, best)
 
-        best = None
+        time_manager.iteration_finished(best)
 
-        if DEBUG:
-            print "for depth " + str(d + 1) + " value = " + str(root.prev_value)
-
-        # If we are the maximising player, find the move with the highest min-max value
-        # Among moves with equal values choose the one that has more moves until the end of the game
-        if player == PLAYER:
-            value = -2 * INF
-
-            for child in G[root.num]:
-                if child.prev_value > value or (child.prev_value == value and child.max_moves > best.max_moves):
-                    value = child.prev_value
-                    best = child
-
-                    if value == INF:
-                        return best.move
-        # If we are the minimising player, find the move with the lowest min-max value
-        # Among moves with equal values choose the one that has more moves until the end of the game
-        else:
-            value = 2 * INF
+        search_stats = SearchStats(completed_depth, value, best, nodes - start_nodes, cutoffs, first_move_cutoffs,
+                                   transposition_table.probes - start_probes, transposition_table.hits - start_hits,
+                                   time_manager.elapsed())
 
-            for child in G[root.num]:
-                if child.prev_value < value or (child.prev_value == value and child.max_moves > best.max_moves):
-                    value = child.prev_value
-                    best = child
+        # Reading the principal variation probes the table, so it is only done for someone who asked for it,
+        # and its probes are not counted
+        if on_iteration is not None:
+            probes, hits = transposition_table.probes, transposition_table.hits
+            search_stats.pv = [best] + principal_variation(board.make_move(best, player), opponent, d)
+            transposition_table.probes, transposition_table.hits = probes, hits
 
-                    if value == -INF:
-                        return best.move
+            on_iteration(search_stats)
 
-    if DEBUG:
-        print "move found in " + str((time.clock() - t) * 1000)
+        if DEBUG:
+            print "for depth " + str(d + 1) + " value = " + str(value)
+
+        # A solved game cannot change any more, whether it is won or lost
+        if abs(value) == INF:
+            break
 
-    return best.move
+    return best
 
 
 def basic_evaluate(board):
     """ Basic evaluation function. Prioritises:
     1) Win the game, if able
     2) Don't lose the game
-    3) Places that are nearest to the middle of the point + a bit of randomisation
+    3) Lines that can still be completed, the more pieces in them the better
+    The score of the lines is kept up to date by the board as moves are made and unmade, so this takes constant time
+    The value of a position is always the same, so that the transposition table entries are consistent
     """
-    value = 0
-
     # Check if the game is won after this move
     game_over = board.check_game_over()
 
@@ -312,24 +616,7 @@ def basic_evaluate(board):
     elif game_over == OUTCOME_AI:
         return -INF
 
-    # Evaluate the board based on the position of all pieces relative to the board's centre
-    for y in range(NUMBER_OF_ROWS):
-        for x in range(NUMBER_OF_COLUMNS):
-            place_score = 1 + NUMBER_OF_COLUMNS + NUMBER_OF_ROWS \
-                          - abs(NUMBER_OF_ROWS / 2 - y) - abs(NUMBER_OF_COLUMNS / 2 - x)
-
-            if y == 0 and x == 3:
-                place_score += 10
-
-            # A bit of randomness can prove you no wrong
-            place_score += random.randint(0, 1)
-
-            if board.get_piece(y, x) == PLAYER:
-                value += place_score
-            elif board.get_piece(y, x) == AI:
-                value -= place_score
-
-    return value
+    return board.score
 
 
 def make_random_move():
@@ -359,9 +646,11 @@ def make_evaluated_move(board, evaluate, player):
 
 
 def reset():
-    """Reset all the AI arrays"""
-    global G, transposition_table, killer
+    """Reset all the AI arrays and the AI's game clock
+    The transposition table is kept, since its entries stay valid in the next game
+    """
+    global killer, history
 
-    G = []
-    transposition_table = {}
     killer = []
+    history = []
+    game_clock.reset()
@@ -0,0 +1,168 @@
+#####
+# Contains the batch evaluation: basic_evaluate and check_game_over computed with NumPy for many positions at once,
+# meant for bulk work such as building the opening book, analysis and tuning, not for the search itself
+# Positions are packed as an N x 2 array of 64-bit integers: the Player's bitboard and the AI's bitboard
+# NumPy is optional, the game itself does not need it
+#####
+
+from connectfour.GameplayStatics import *
+from connectfour.LevelManager.Board import FULL_BOARD_MASK, bottom_masks, column_masks, top_masks, lines, \
+    line_weights, win_shifts
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+# Outcome codes returned by batch_check_game_over, the outcome strings they stand for are indexed by them
+BATCH_OUTCOME_NOTHING = 0
+BATCH_OUTCOME_PLAYER = 1
+BATCH_OUTCOME_AI = 2
+BATCH_OUTCOME_DRAW = 3
+
+BATCH_OUTCOMES = [OUTCOME_NOTHING, OUTCOME_PLAYER, OUTCOME_AI, OUTCOME_DRAW]
+
+if numpy is not None:
+    _lines = numpy.array(lines, dtype=numpy.uint64)
+
+    _line_weights = numpy.array(line_weights, dtype=numpy.int64)
+
+    _win_shifts = [[numpy.uint64(shift) for shift in direction_shifts] for direction_shifts in win_shifts]
+
+    _full_board_mask = numpy.uint64(FULL_BOARD_MASK)
+
+    _bottom_masks = numpy.array(bottom_masks, dtype=numpy.uint64)
+    _top_masks = numpy.array(top_masks, dtype=numpy.uint64)
+    _column_masks = numpy.array(column_masks, dtype=numpy.uint64)
+
+
+def _check_numpy():
+    """ Raises ImportError if NumPy is not installed
+    """
+    if numpy is None:
+        raise ImportError("batch evaluation requires numpy")
+
+
+def pack_boards(boards):
+    """ Returns the packed array of the given Board objects
+    """
+    _check_numpy()
+
+    return numpy.array([[board.get_masks(PLAYER)[0], board.get_masks(AI)[0]] for board in boards], dtype=numpy.uint64)
+
+
+def batch_popcount(masks):
+    """ Returns an array of the amounts of set bits in the given bitboards, counted in parallel within every integer
+    """
+    masks = masks - ((masks >> numpy.uint64(1)) & numpy.uint64(0x5555555555555555))
+    masks = (masks & numpy.uint64(0x3333333333333333)) + \
+            ((masks >> numpy.uint64(2)) & numpy.uint64(0x3333333333333333))
+    masks = (masks + (masks >> numpy.uint64(4))) & numpy.uint64(0x0F0F0F0F0F0F0F0F)
+
+    return (masks * numpy.uint64(0x0101010101010101)) >> numpy.uint64(56)
+
+
+def batch_is_winning_mask(masks):
+    """ Returns a boolean array telling which of the given bitboards contain NUMBER_TO_CONNECT connected pieces
+    """
+    won = numpy.zeros(len(masks), dtype=bool)
+
+    for direction_shifts in _win_shifts:
+        m = masks.copy()
+
+        for shift in direction_shifts:
+            m &= m >> shift
+
+        won |= m != 0
+
+    return won
+
+
+def batch_check_game_over(packed):
+    """ Returns an array of outcome codes of the packed positions, as Board.check_game_over for a board
+    whose last move is not known: the Player's pieces are checked first
+    """
+    _check_numpy()
+
+    player_masks = packed[:, 0]
+    ai_masks = packed[:, 1]
+
+    outcomes = numpy.full(len(packed), BATCH_OUTCOME_NOTHING, dtype=numpy.int8)
+
+    outcomes[(player_masks | ai_masks) == _full_board_mask] = BATCH_OUTCOME_DRAW
+    outcomes[batch_is_winning_mask(ai_masks)] = BATCH_OUTCOME_AI
+    outcomes[batch_is_winning_mask(player_masks)] = BATCH_OUTCOME_PLAYER
+
+    return outcomes
+
+
+def batch_line_score(packed):
+    """ Returns an array of the line scores of the packed positions from the Player's point of view,
+    the same as Board.score
+    """
+    _check_numpy()
+
+    # The amounts of pieces of both players in every line, a position x line array
+    player_counts = batch_popcount(packed[:, 0, None] & _lines)
+    ai_counts = batch_popcount(packed[:, 1, None] & _lines)
+
+    # A line counts only for the player who is the only one to have pieces in it
+    player_scores = numpy.where(ai_counts == 0, _line_weights[player_counts], 0)
+    ai_scores = numpy.where(player_counts == 0, _line_weights[ai_counts], 0)
+
+    return (player_scores - ai_scores).sum(axis=1)
+
+
+def batch_evaluate(packed):
+    """ Returns an array of the values basic_evaluate gives the packed positions
+    """
+    outcomes = batch_check_game_over(packed)
+
+    scores = batch_line_score(packed)
+    scores[outcomes == BATCH_OUTCOME_PLAYER] = INF
+    scores[outcomes == BATCH_OUTCOME_AI] = -INF
+
+    return scores
+
+
+def batch_random_games(positions, masks):
+    """ Plays random games from all given positions at once, one move of every unfinished game per step
+    positions are the bitboards of the players to move and masks the bitboards of all pieces
+    Returns an array of the results for the players to move: 1 for a win, 0 for a loss and 0.5 for a draw
+    """
+    _check_numpy()
+
+    results = numpy.full(len(positions), 0.5)
+
+    # The indices of the unfinished games and their positions
+    games = numpy.arange(len(positions))
+    positions = numpy.asarray(positions, dtype=numpy.uint64)
+    masks = numpy.asarray(masks, dtype=numpy.uint64)
+
+    # The result of a win of the player moving in the current step
+    win_result = 1.0
+
+    while len(games):
+        # Games on a full board are drawn
+        playing = masks != _full_board_mask
+        games = games[playing]
+        positions = positions[playing]
+        masks = masks[playing]
+
+        # Choose a random legal column for every game: the legal one given the highest random number
+        legal = (masks[:, None] & _top_masks) == 0
+        columns = (numpy.random.random_sample(legal.shape) * legal).argmax(axis=1)
+
+        moves = (masks + _bottom_masks[columns]) & _column_masks[columns]
+
+        won = batch_is_winning_mask(positions | moves)
+        results[games[won]] = win_result
+
+        # The other player moves next in the games that go on, their pieces are all the pieces but ours
+        playing = ~won
+        games = games[playing]
+        positions, masks = (masks ^ positions)[playing], (masks | moves)[playing]
+
+        win_result = 1.0 - win_result
+
+    return results
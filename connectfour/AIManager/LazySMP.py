@@ -0,0 +1,147 @@
+#####
+# Contains the Lazy SMP search: several processes run the same iterative-deepening alpha-beta search on the same
+# position and share one transposition table, so every process benefits from the entries stored by the others
+# The processes differ slightly in the depths they search and in the order of the root moves,
+# so that they do not all search the same part of the tree at the same time
+#####
+
+import multiprocessing
+import threading
+from connectfour.GameplayStatics import *
+from connectfour.AIManager import AIManager
+from connectfour.AIManager.TimeManager import TimeManager
+from connectfour.AIManager.TranspositionTable import SharedTranspositionTable
+from connectfour.AIManager import ProcessPool
+
+# The names re-exported by the package, the pool functions are reached through the module
+# as every search using a pool has its own ones
+__all__ = ['make_lazy_smp_move']
+
+# How often, in seconds, a search process checks whether another one has already finished
+STOP_CHECK_INTERVAL = 0.01
+
+# The transposition table shared by all search processes, created once with the first pool
+shared_table = None
+
+# Set to 1 once the first process has finished its search, the others stop as soon as they notice it
+stop_flag = None
+
+
+def init_worker(table, flag):
+    """ Prepares a search process: its search uses the shared table and its moves must come from searching
+    and not from the opening book
+    """
+    global shared_table, stop_flag
+
+    shared_table = table
+    stop_flag = flag
+
+    AIManager.transposition_table = table
+    AIManager.opening_book.close()
+
+
+def watch_stop_flag(done):
+    """ Stops the search of this process once the stop flag is set, runs in a background thread until done is set
+    """
+    while not done.is_set():
+        if stop_flag.value:
+            AIManager.search_stopped = True
+            return
+
+        done.wait(STOP_CHECK_INTERVAL)
+
+
+def lazy_smp_search(task):
+    """ Runs the iterative-deepening search of a single process, the board comes pickled in its compact form
+    Every process gets a copy of the time manager of the search, its deadline is on the wall clock,
+    which is the same for all processes
+    Returns the best move and the depth it was found at
+    """
+    board, player, evaluate, depth, time_manager, generation, index = task
+
+    # The generation is chosen by the process that started the search
+    shared_table.generation = generation
+
+    AIManager.search_stopped = False
+
+    done = threading.Event()
+    watcher = threading.Thread(target=watch_stop_flag, args=(done,))
+    watcher.daemon = True
+    watcher.start()
+
+    # Every process starts with a different root move and every other process starts one ply deeper
+    root_moves = [x for x in AIManager.CENTRE_ORDER if board.is_move_legal(x)]
+    shift = index % len(root_moves)
+    root_moves = root_moves[shift:] + root_moves[:shift]
+
+    best = AIManager.iterative_deepening(board, evaluate, player, depth, time_manager, root_moves, index % 2)
+
+    done.set()
+    watcher.join()
+
+    AIManager.search_stopped = False
+
+    return best, AIManager.completed_depth
+
+
+def get_pool(processes):
+    """ Returns the pool with the given amount of search processes, replacing the current one if its size differs
+    """
+    global shared_table, stop_flag
+
+    # The shared memory must exist before the processes start, so that they can map it
+    if shared_table is None:
+        shared_table = SharedTranspositionTable(TRANSPOSITION_TABLE_SIZE)
+        stop_flag = multiprocessing.RawValue('b', 0)
+
+    return ProcessPool.get_pool(init_worker, processes, (shared_table, stop_flag))
+
+
+def shutdown_pool():
+    """ Terminates the search processes, does nothing if there are none
+    The shared table is kept for the next pool
+    """
+    ProcessPool.shutdown_pool(init_worker)
+
+
+def make_lazy_smp_move(board, evaluate, player, depth=NUMBER_OF_COLUMNS * NUMBER_OF_ROWS, time_limit=TIME_TO_MOVE,
+                       processes=None):
+    """ Performs alpha-beta search in the given amount of processes sharing a transposition table, by default one
+    per processor core, to find the best possible move using the given evaluate function
+    The search takes at most time_limit milliseconds, the move found at the greatest depth is chosen
+    """
+    # Book moves, forced moves and solved positions need no search
+    shortcut_move, time_limit = AIManager.get_shortcut_move(board, player, time_limit)
+
+    if shortcut_move is not None:
+        return shortcut_move
+
+    processes = processes or multiprocessing.cpu_count()
+    pool = get_pool(processes)
+
+    # The entries of the previous searches are still valid, they are only replaced first
+    shared_table.new_search()
+    stop_flag.value = 0
+
+    # Set up the timer
+    time_manager = TimeManager(time_limit)
+
+    tasks = [(board, player, evaluate, depth, time_manager, shared_table.generation, i) for i in range(processes)]
+
+    best = None
+    best_depth = 0
+
+    for move, completed_depth in pool.imap_unordered(lazy_smp_search, tasks):
+        # The first process to finish has either used all the time or reached the full depth,
+        # so the others can stop as well
+        stop_flag.value = 1
+
+        if completed_depth > best_depth:
+            best = move
+            best_depth = completed_depth
+
+    if DEBUG:
+        print "move found at depth " + str(best_depth) + " in " + str(time_manager.elapsed() * 1000) + " on " + \
+              str(processes) + " processes, transposition table fill ratio = " + str(shared_table.fill_ratio())
+
+    return best
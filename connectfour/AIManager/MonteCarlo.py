@@ -0,0 +1,448 @@
+#####
+# Contains the Monte Carlo tree search: the UCT algorithm estimating the value of moves with random games
+# The tree is kept in flat arrays, one value per node in each, and the random games are played on bitboards,
+# so no Board objects are created during the search
+# The tree is kept between moves, the part below the new position is reused by the next search
+#####
+
+import functools
+import math
+import random
+from array import array
+from connectfour.GameplayStatics import *
+from connectfour.AIManager import AIManager
+from connectfour.AIManager import BatchEvaluation
+from connectfour.AIManager import ProcessPool
+from connectfour.AIManager.TimeManager import clock
+from connectfour.LevelManager.Board import COLUMN_HEIGHT, FULL_BOARD_MASK, bottom_masks, column_masks, top_masks, \
+    is_winning_mask
+
+# The names re-exported by the package, the pool functions are reached through the module
+# as every search using a pool has its own ones
+__all__ = ['MonteCarloTree', 'random_game', 'make_monte_carlo_move']
+
+# The default amount of nodes in the tree, the search stops growing the tree once all are used
+TREE_SIZE = 1 << 20
+
+# The default amount of leaves selected before their random games are played, when playing them in batches
+BATCH_SIZE = 256
+
+# States of the nodes: the game goes on, the move leading to the node has won the game or the game ended in a draw
+NODE_PLAYING = 0
+NODE_WON = 1
+NODE_DRAW = 2
+
+
+def random_game(position, mask):
+    """ Plays random moves until the end of the game, position is the mask of the pieces of the player to move
+    and mask the mask of all pieces. Returns 1 if the player to move wins, 0 if they lose and 0.5 for a draw
+    """
+    result = 1
+
+    while mask != FULL_BOARD_MASK:
+        x = random.randint(0, NUMBER_OF_COLUMNS - 1)
+
+        while mask & top_masks[x]:
+            x = random.randint(0, NUMBER_OF_COLUMNS - 1)
+
+        move = (mask + bottom_masks[x]) & column_masks[x]
+
+        if is_winning_mask(position | move):
+            return result
+
+        # The other player moves next, their pieces are all the pieces but ours
+        position, mask = mask ^ position, mask | move
+        result = 1 - result
+
+    return 0.5
+
+
+def get_column(piece):
+    """ Returns the column of the given single piece
+    """
+    return (piece.bit_length() - 1) // COLUMN_HEIGHT
+
+
+def is_single_piece(pieces):
+    """ Returns True if exactly one bit of the given mask is set
+    """
+    return pieces != 0 and pieces & (pieces - 1) == 0
+
+
+class MonteCarloTree(object):
+    """ The search tree of the Monte Carlo tree search, preallocated once and never grown
+    Every node is spread over a few flat arrays: the move leading to it, its parent, its first child, the amount
+    of its children, its state, the amount of random games played through it and the sum of their results
+    for the player who made the move leading to it. The children of a node take consecutive indices
+    Positions are not stored, they are recreated by playing the moves from the root
+    """
+
+    def __init__(self, size=TREE_SIZE):
+        """ Allocates a tree of at most size nodes
+        """
+        self.size = size
+
+        self.moves = array('b', [0]) * size
+        self.parents = array('i', [0]) * size
+        self.first_children = array('i', [0]) * size
+        self.child_counts = array('B', [0]) * size
+        self.states = array('B', [0]) * size
+        self.visits = array('I', [0]) * size
+        self.results = array('f', [0]) * size
+
+        # The amount of nodes in use
+        self.used = 0
+
+        # The root node and its position: the pieces of the player to move and all pieces
+        self.root = -1
+        self.root_position = 0
+        self.root_mask = 0
+
+    def clear(self):
+        """ Removes all nodes from the tree
+        """
+        self.used = 0
+        self.root = -1
+
+    def add_node(self, parent, move, state):
+        """ Adds a node with no games played through it, returns its index
+        """
+        node = self.used
+        self.used += 1
+
+        self.moves[node] = move
+        self.parents[node] = parent
+        self.first_children[node] = -1
+        self.child_counts[node] = 0
+        self.states[node] = state
+        self.visits[node] = 0
+        self.results[node] = 0
+
+        return node
+
+    def get_child(self, node, move):
+        """ Returns the child of the node reached with the given move, or -1 if the node has no such child
+        """
+        first = self.first_children[node]
+
+        if first == -1:
+            return -1
+
+        for child in range(first, first + self.child_counts[node]):
+            if self.moves[child] == move:
+                return child
+
+        return -1
+
+    def find_root_moves(self, position, mask):
+        """ Returns the columns of the moves leading from the root to the given position, if it follows the root
+        by a single move or by a move of each player, otherwise None
+        """
+        own = self.root_position
+        opponent = self.root_mask ^ self.root_position
+
+        if (position, mask) == (self.root_position, self.root_mask):
+            return []
+
+        # The opponent is to move after a move of the player to move at the root
+        own_move = (mask ^ position) ^ own
+
+        if position == opponent and own_move & own == 0 and is_single_piece(own_move):
+            return [get_column(own_move)]
+
+        # The same player is to move after a move of each player
+        own_move = position ^ own
+        opponent_move = (mask ^ position) ^ opponent
+
+        if own_move & own == 0 and is_single_piece(own_move) and \
+                opponent_move & opponent == 0 and is_single_piece(opponent_move):
+            return [get_column(own_move), get_column(opponent_move)]
+
+        return None
+
+    def set_root(self, position, mask):
+        """ Makes the node of the given position the root, position being the pieces of the player to move
+        and mask all pieces. If the position follows the current root closely and its node exists, the tree below
+        it is kept, otherwise the tree is started anew. It is also started anew when more than half of it is used,
+        since the nodes left above the new root are never freed
+        """
+        node = self.root
+
+        if node != -1:
+            moves = self.find_root_moves(position, mask)
+
+            if moves is None:
+                node = -1
+            else:
+                for x in moves:
+                    if node != -1:
+                        node = self.get_child(node, x)
+
+        if node == -1 or self.used * 2 > self.size:
+            self.clear()
+            node = self.add_node(-1, -1, NODE_PLAYING)
+        else:
+            # The new root has no parent to pass the results of games to
+            self.parents[node] = -1
+
+        self.root = node
+        self.root_position = position
+        self.root_mask = mask
+
+    def expand(self, node, position, mask):
+        """ Adds the children of the node in the given position, if there is room for them in the tree
+        """
+        if self.used + NUMBER_OF_COLUMNS > self.size:
+            return
+
+        self.first_children[node] = self.used
+
+        for x in range(NUMBER_OF_COLUMNS):
+            if mask & top_masks[x]:
+                continue
+
+            move = (mask + bottom_masks[x]) & column_masks[x]
+
+            if is_winning_mask(position | move):
+                state = NODE_WON
+            elif mask | move == FULL_BOARD_MASK:
+                state = NODE_DRAW
+            else:
+                state = NODE_PLAYING
+
+            self.add_node(node, x, state)
+
+        self.child_counts[node] = self.used - self.first_children[node]
+
+    def select_child(self, node, exploration):
+        """ Returns the child of the node with the highest upper confidence bound, a child never visited comes first
+        The bound results / visits + exploration * sqrt(log(parent visits) / visits) is computed
+        as (results + c * sqrt(visits)) / visits, with c computed once for all children
+        """
+        first = self.first_children[node]
+        visits = self.visits
+        results = self.results
+
+        c = exploration * math.sqrt(math.log(max(visits[node], 1)))
+
+        best = first
+        best_bound = -1.0
+
+        for child in range(first, first + self.child_counts[node]):
+            child_visits = visits[child]
+
+            if child_visits == 0:
+                return child
+
+            bound = (results[child] + c * math.sqrt(child_visits)) / child_visits
+
+            if bound > best_bound:
+                best = child
+                best_bound = bound
+
+        return best
+
+    def select_leaf(self, exploration):
+        """ Selects a leaf to play a random game from, expanding it first if it has been visited before
+        The visit is counted on the whole path at once, before the result is known, as if every player on the path
+        lost the game (a virtual loss), so that the selections made before the result is backed up avoid the path
+        Returns the leaf, its position and, if the leaf ends the game, the result for the player who made
+        the move leading to it, otherwise None
+        """
+        node = self.root
+        position = self.root_position
+        mask = self.root_mask
+
+        # Selection, the position is recreated on the way down
+        while self.first_children[node] != -1:
+            node = self.select_child(node, exploration)
+
+            x = self.moves[node]
+            position, mask = mask ^ position, mask | ((mask + bottom_masks[x]) & column_masks[x])
+
+        # Expansion, once the node has been visited before
+        if self.states[node] == NODE_PLAYING and (self.visits[node] > 0 or node == self.root):
+            self.expand(node, position, mask)
+
+            if self.first_children[node] != -1:
+                node = self.select_child(node, exploration)
+
+                x = self.moves[node]
+                position, mask = mask ^ position, mask | ((mask + bottom_masks[x]) & column_masks[x])
+
+        state = self.states[node]
+
+        if state == NODE_WON:
+            result = 1
+        elif state == NODE_DRAW:
+            result = 0.5
+        else:
+            result = None
+
+        leaf = node
+
+        while node != -1:
+            self.visits[node] += 1
+            node = self.parents[node]
+
+        return leaf, position, mask, result
+
+    def back_up(self, node, result):
+        """ Adds the result of a game for the player who made the move leading to the node to the node
+        and its ancestors, alternating the point of view. The visits were already counted by select_leaf
+        """
+        while node != -1:
+            self.results[node] += result
+
+            result = 1 - result
+            node = self.parents[node]
+
+    def iterate(self, exploration):
+        """ Performs a single iteration of the search: selects a leaf, expands it, plays a random game from it
+        and backs up its result
+        """
+        node, position, mask, result = self.select_leaf(exploration)
+
+        if result is None:
+            # The random game is played by the player to move in the node, the opponent of the one who moved
+            result = 1 - random_game(position, mask)
+
+        self.back_up(node, result)
+
+    def iterate_batch(self, exploration, batch_size, play_games):
+        """ Performs batch_size iterations of the search at once: selects the leaves, relying on virtual losses
+        to spread them over the tree, plays random games from all of them with play_games and backs up the results
+        play_games takes a list of (position, mask) pairs and returns the results for the players to move
+        """
+        leaves = []
+        games = []
+
+        for i in range(batch_size):
+            node, position, mask, result = self.select_leaf(exploration)
+
+            if result is None:
+                leaves.append(node)
+                games.append((position, mask))
+            else:
+                self.back_up(node, result)
+
+        if not games:
+            return
+
+        for node, result in zip(leaves, play_games(games)):
+            self.back_up(node, 1 - result)
+
+    def best_move(self):
+        """ Returns the column of the most visited child of the root, a winning move is returned at once
+        """
+        first = self.first_children[self.root]
+
+        best = -1
+        best_visits = -1
+
+        for child in range(first, first + self.child_counts[self.root]):
+            if self.states[child] == NODE_WON:
+                return self.moves[child]
+
+            if self.visits[child] > best_visits:
+                best = self.moves[child]
+                best_visits = self.visits[child]
+
+        return best
+
+
+# The tree of the Monte Carlo tree search, kept between moves, it is allocated by the first search
+monte_carlo_tree = None
+
+
+def init_worker():
+    """ Prepares a process playing random games, every process must play different games
+    """
+    random.seed()
+
+
+def play_random_games(games):
+    """ Plays a random game from every given (position, mask) pair, returns the results for the players to move
+    """
+    return [random_game(position, mask) for position, mask in games]
+
+
+def play_numpy_random_games(games):
+    """ Plays a random game from every given (position, mask) pair at once with NumPy,
+    returns the results for the players to move
+    """
+    positions, masks = zip(*games)
+
+    return BatchEvaluation.batch_random_games(positions, masks)
+
+
+def play_pool_random_games(pool, processes, games):
+    """ Plays a random game from every given (position, mask) pair, splitting the games evenly between
+    the given amount of processes of the pool, returns the results for the players to move
+    """
+    part_size = -(-len(games) // processes)
+    results = []
+
+    for part in pool.map(play_random_games, [games[i:i + part_size] for i in range(0, len(games), part_size)]):
+        results.extend(part)
+
+    return results
+
+
+def get_pool(processes):
+    """ Returns the pool with the given amount of processes, replacing the current one if its size differs
+    """
+    return ProcessPool.get_pool(init_worker, processes)
+
+
+def shutdown_pool():
+    """ Terminates the processes playing random games, does nothing if there are none
+    """
+    ProcessPool.shutdown_pool(init_worker)
+
+
+def make_monte_carlo_move(board, evaluate, player, exploration=math.sqrt(2), time_limit=TIME_TO_MOVE, batch_size=1,
+                          processes=0):
+    """ Performs Monte Carlo tree search to find the best possible move, using the given exploration constant
+    The values come from random games, evaluate is taken for the same calling convention as the other searches
+    With batch_size above 1 the random games are played in batches: in the given amount of processes,
+    or with NumPy in this process if processes is 0 and NumPy is installed
+    The search takes at most time_limit milliseconds
+    """
+    global monte_carlo_tree
+
+    if monte_carlo_tree is None:
+        monte_carlo_tree = MonteCarloTree(TREE_SIZE)
+
+    if processes:
+        play_games = functools.partial(play_pool_random_games, get_pool(processes), processes)
+    elif BatchEvaluation.numpy is not None:
+        play_games = play_numpy_random_games
+    else:
+        play_games = play_random_games
+
+    position, mask = board.get_masks(player)
+
+    monte_carlo_tree.set_root(position, mask)
+
+    # Set up the timer
+    t = clock()
+    deadline = t + time_limit / 1000.0
+
+    iterations = 0
+
+    # The root must be expanded to have a move to choose from
+    while iterations == 0 or (not AIManager.search_stopped and clock() < deadline):
+        if batch_size > 1:
+            monte_carlo_tree.iterate_batch(exploration, batch_size, play_games)
+            iterations += batch_size
+        else:
+            monte_carlo_tree.iterate(exploration)
+            iterations += 1
+
+    if DEBUG:
+        print "monte carlo: " + str(iterations) + " iterations, " + \
+              str(monte_carlo_tree.visits[monte_carlo_tree.root]) + " games through the root, " + \
+              str(monte_carlo_tree.used) + " nodes in " + str((clock() - t) * 1000)
+
+    return monte_carlo_tree.best_move()
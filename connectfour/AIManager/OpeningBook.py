@@ -0,0 +1,88 @@
+#####
+# Contains the opening book: a file of precomputed moves for the positions at the start of the game
+# The file starts with a short header followed by records sorted by the Zobrist hash of their position,
+# each record being the 8-byte little-endian hash and the 1-byte move
+#####
+
+import mmap
+import os
+import struct
+from connectfour.GameplayStatics import *
+
+# The header identifying the file format and the generation of the Zobrist hash values its records are keyed by,
+# a book with another header, built with other hash values, is not used
+BOOK_HEADER = 'C4BOOK02'
+
+# Format of a single record: the hash of the position and the move to play in it
+RECORD_FORMAT = '<Qb'
+RECORD_SIZE = struct.calcsize(RECORD_FORMAT)
+
+# The path of the book file, a relative BOOK_FILE is taken from the directory of the game and not the current one,
+# so that the book is found wherever the game is started from
+BOOK_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))), BOOK_FILE)
+
+
+def write_book(path, entries):
+    """ Writes the given (hash, move) pairs to the opening book file at path
+    """
+    entries = sorted(entries)
+
+    with open(path, 'wb') as f:
+        f.write(BOOK_HEADER)
+
+        for h, move in entries:
+            f.write(struct.pack(RECORD_FORMAT, h, move))
+
+
+class OpeningBook(object):
+    """ An opening book memory-mapped from its file, so loading it costs nothing and positions are looked up
+    with a binary search directly in the mapped file
+    A missing or invalid file gives an empty book
+    """
+
+    def __init__(self, path):
+        """ Maps the book file at path, if there is one
+        """
+        self._map = None
+        self.size = 0
+
+        if not os.path.isfile(path) or os.path.getsize(path) <= len(BOOK_HEADER):
+            return
+
+        with open(path, 'rb') as f:
+            book_map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+        if book_map[:len(BOOK_HEADER)] != BOOK_HEADER:
+            book_map.close()
+            return
+
+        self._map = book_map
+        self.size = (len(book_map) - len(BOOK_HEADER)) // RECORD_SIZE
+
+    def lookup(self, h):
+        """ Returns the book move for the position with the given hash, or None if it is not in the book
+        """
+        low = 0
+        high = self.size
+
+        while low < high:
+            middle = (low + high) // 2
+            key, move = struct.unpack_from(RECORD_FORMAT, self._map, len(BOOK_HEADER) + middle * RECORD_SIZE)
+
+            if key == h:
+                return move
+            elif key < h:
+                low = middle + 1
+            else:
+                high = middle
+
+        return None
+
+    def close(self):
+        """ Unmaps the book file
+        """
+        if self._map is not None:
+            self._map.close()
+
+        self._map = None
+        self.size = 0
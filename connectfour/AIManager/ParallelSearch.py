@@ -0,0 +1,194 @@
+#####
+# Contains the parallel alpha-beta search: the moves at the root are split between the processes of a pool,
+# every process searching its moves with the alpha-beta search and its own transposition table
+# The best value found so far is shared between the processes, so every root move is searched
+# with the tightest bound known at the time it is started
+#####
+
+import multiprocessing
+from connectfour.GameplayStatics import *
+from connectfour.AIManager import AIManager
+from connectfour.AIManager.TimeManager import TimeManager
+from connectfour.AIManager import ProcessPool
+
+# The names re-exported by the package, the pool functions are reached through the module
+# as every search using a pool has its own ones
+__all__ = ['make_parallel_alpha_beta_move']
+
+# The best root value found so far in the current iteration, shared by all processes
+# The bound is created with the first pool and handed to its processes when they start
+shared_bound = None
+
+# The number of the current search, counted by this process and handed to the search processes with every root move
+search_number = 0
+
+# The number of the latest search the history of a search process was aged for
+aged_search_number = 0
+
+
+def init_worker(bound):
+    """ Prepares a search process, the moves must come from searching and not from the opening book
+    """
+    global shared_bound
+
+    shared_bound = bound
+
+    AIManager.opening_book.close()
+
+
+def search_root_move(task):
+    """ Searches a single root move in a search process, the board comes pickled in its compact form
+    Returns the move, its value, the distance to the deepest end-node and whether the value is exact rather than
+    a bound, the value is None if the time ran out
+    The deadline is on the wall clock, which is the same for all processes
+    """
+    global aged_search_number
+
+    board, move, player, evaluate, depth, deadline, number = task
+
+    opponent = AI if player == PLAYER else PLAYER
+
+    # The processes do not share their killer moves, every search of a root move starts them anew
+    AIManager.clear_killers()
+
+    # The history of every process is aged once per search, as in the serial search, also for the searches
+    # the process had no root moves in, so that how much it has aged does not depend on which moves it got
+    AIManager.age_history(number - aged_search_number)
+    aged_search_number = number
+
+    # Only a move better than the best one found so far is of interest
+    if player == PLAYER:
+        alpha = shared_bound.value
+        beta = 2 * INF
+    else:
+        alpha = -2 * INF
+        beta = shared_bound.value
+
+    board.play(move, player)
+
+    try:
+        value = AIManager.alpha_beta(board, depth, 1, alpha, beta, opponent, evaluate, deadline)
+    except AIManager.SearchTimeout:
+        return move, None, 0, False
+
+    # Tighten the bound for the moves that are still to be searched
+    with shared_bound.get_lock():
+        if (player == PLAYER and value > shared_bound.value) or (player == AI and value < shared_bound.value):
+            shared_bound.value = value
+
+    return move, value, AIManager.ply_max_moves[1], alpha < value < beta
+
+
+def get_pool(processes):
+    """ Returns the pool with the given amount of search processes, replacing the current one if its size differs
+    """
+    global shared_bound
+
+    # The bound holds values between -2 * INF and 2 * INF, which fit in a 32-bit integer
+    # This process resets it before every iteration
+    if shared_bound is None:
+        shared_bound = multiprocessing.Value('i', 0)
+
+    return ProcessPool.get_pool(init_worker, processes, (shared_bound,))
+
+
+def shutdown_pool():
+    """ Terminates the search processes, does nothing if there are none
+    """
+    ProcessPool.shutdown_pool(init_worker)
+
+
+def make_parallel_alpha_beta_move(board, evaluate, player, depth=NUMBER_OF_COLUMNS * NUMBER_OF_ROWS,
+                                  time_limit=TIME_TO_MOVE, processes=None):
+    """ Performs alpha-beta search split at the root between the given amount of processes, by default one
+    per processor core, to find the best possible move using the given evaluate function
+    The search takes at most time_limit milliseconds
+    """
+    global search_number
+
+    # Book moves, forced moves and solved positions need no search
+    shortcut_move, time_limit = AIManager.get_shortcut_move(board, player, time_limit)
+
+    if shortcut_move is not None:
+        return shortcut_move
+
+    # The search processes age their history when they see a new search number
+    search_number += 1
+
+    # The root moves, the best one of the previous iteration is moved to the front
+    root_moves = [x for x in AIManager.CENTRE_ORDER if board.is_move_legal(x)]
+
+    processes = processes or multiprocessing.cpu_count()
+    pool = get_pool(processes)
+
+    # Set up the timer
+    time_manager = TimeManager(time_limit)
+
+    best = None
+
+    # Iterative deepening
+    for d in range(depth):
+
+        # If the search was stopped or the next iteration is not worth starting, terminate
+        if AIManager.search_stopped or not time_manager.can_start_iteration():
+            break
+
+        shared_bound.value = -2 * INF if player == PLAYER else 2 * INF
+
+        tasks = [(board, x, player, evaluate, d, time_manager.deadline, search_number) for x in root_moves]
+
+        # The best move of the previous iteration is searched alone first, it is most likely to be the best again
+        # and gives the other moves a tight bound
+        results = [pool.apply(search_root_move, (tasks[0],))]
+        results.extend(pool.map(search_root_move, tasks[1:], chunksize=1))
+
+        # If the previous best move was not searched to the end, there is no use to update our best move
+        if results[0][1] is None:
+            break
+
+        # Among moves with equal exact values choose the one that has more moves until the end,
+        # two equal bounds tell nothing about which move is better, so the first move found is kept
+        iteration_best = None
+        best_value = 0
+        best_max_moves = 0
+        best_exact = False
+
+        for x, value, max_moves, exact in results:
+            # A move that was not searched to the end cannot be compared with the others
+            if value is None:
+                continue
+
+            if player == AI:
+                value = -value
+
+            if iteration_best is None or value > best_value or \
+                    (value == best_value and exact and best_exact and max_moves > best_max_moves):
+                iteration_best = x
+                best_value = value
+                best_max_moves = max_moves
+                best_exact = exact
+
+        best = iteration_best
+        value = best_value if player == PLAYER else -best_value
+
+        # The moves searched to the end in an unfinished iteration are compared with the previous best move,
+        # so the best of them is still worth playing, but the search ends
+        if any(x[1] is None for x in results):
+            break
+
+        root_moves.remove(best)
+        root_moves.insert(0, best)
+
+        time_manager.iteration_finished(best)
+
+        if DEBUG:
+            print "for depth " + str(d + 1) + " value = " + str(value)
+
+        # A solved game cannot change any more, whether it is won or lost
+        if abs(value) == INF:
+            break
+
+    if DEBUG:
+        print "move found in " + str(time_manager.elapsed() * 1000) + " on " + str(processes) + " processes"
+
+    return best
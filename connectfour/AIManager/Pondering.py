@@ -0,0 +1,84 @@
+#####
+# This module lets the AI search on the Player's time, while the game waits for the Player's input
+#####
+
+import threading
+from connectfour.GameplayStatics import *
+from connectfour.AIManager import AIManager
+
+# The thread searching the Player's likely replies, None if we are not pondering
+_ponder_thread = None
+
+# The AI moves found while pondering, keyed by the hash of the board after the Player's reply
+ponder_moves = {}
+
+
+def ponder(board, evaluate, player, search):
+    """ Searches the AI's answer to every reply of the player, most likely replies first
+    The answers are stored in ponder_moves, the searches also fill the transposition table,
+    so a reply that was not searched to the end still gets a head start
+    """
+    opponent = AI if player == PLAYER else PLAYER
+
+    replies = [x for x in AIManager.CENTRE_ORDER if board.is_move_legal(x)]
+
+    # Assume the player is most likely to choose the replies that the evaluation function likes best for them
+    replies.sort(key=lambda x: evaluate(board.make_move(x, player)), reverse=(player == PLAYER))
+
+    for x in replies:
+        child = board.make_move(x, player)
+
+        if child.check_game_over() != OUTCOME_NOTHING:
+            continue
+
+        move = search(child, evaluate, opponent)
+
+        # A stopped search has not used all of its time, so its result is not stored
+        if AIManager.search_stopped:
+            return
+
+        ponder_moves[child.hash] = move
+
+        if DEBUG:
+            print "pondered reply " + str(x) + ", answer " + str(move)
+
+
+def start_pondering(board, evaluate, player, search=AIManager.make_alpha_beta_move):
+    """ Starts searching the replies of the player to move on the given board in a background thread
+    """
+    global _ponder_thread
+
+    stop_pondering()
+    ponder_moves.clear()
+
+    _ponder_thread = threading.Thread(target=ponder, args=(board.copy(), evaluate, player, search))
+
+    # Never keep the program alive only to finish pondering
+    _ponder_thread.daemon = True
+    _ponder_thread.start()
+
+
+def stop_pondering():
+    """ Stops the background search and waits for it to finish, does nothing if we are not pondering
+    """
+    global _ponder_thread
+
+    if _ponder_thread is None:
+        return
+
+    AIManager.search_stopped = True
+    _ponder_thread.join()
+
+    _ponder_thread = None
+    AIManager.search_stopped = False
+
+
+def get_ponder_move(board):
+    """ Returns the move found while pondering for the given board, or None if it was not searched to the end
+    """
+    move = ponder_moves.get(board.hash)
+
+    if move is None or not board.is_move_legal(move):
+        return None
+
+    return move
@@ -0,0 +1,38 @@
+#####
+# Contains the pools of worker processes used by the searches, created on first use and kept between moves
+# Every kind of worker has its own pool, told apart by the function preparing its processes
+#####
+
+import multiprocessing
+
+# The pools and the amounts of their processes, keyed by the functions preparing their processes
+_pools = {}
+
+
+def get_pool(initializer, processes, initargs=()):
+    """ Returns the pool of processes prepared by the initializer called with initargs,
+    replacing the current one if its size differs
+    """
+    pool, size = _pools.get(initializer, (None, 0))
+
+    if pool is not None and size != processes:
+        shutdown_pool(initializer)
+        pool = None
+
+    if pool is None:
+        pool = multiprocessing.Pool(processes, initializer=initializer, initargs=initargs)
+        _pools[initializer] = (pool, processes)
+
+    return pool
+
+
+def shutdown_pool(initializer):
+    """ Terminates the processes prepared by the initializer, does nothing if there are none
+    """
+    pool, size = _pools.pop(initializer, (None, 0))
+
+    if pool is None:
+        return
+
+    pool.terminate()
+    pool.join()
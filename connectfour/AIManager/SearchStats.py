@@ -0,0 +1,49 @@
+#####
+# Contains the statistics of the alpha-beta search, collected after every completed iteration
+#####
+
+
+class SearchStats(object):
+    """ The state of a search after a completed iteration: its depth, the value and the best move it found,
+    the counters of the search up to its end and the time since the search started
+    The principal variation, the moves both players are expected to play starting with the best move,
+    is only read from the transposition table if someone asked for it, otherwise it is empty
+    The cutoffs are only counted if counting them was not switched off
+    """
+
+    __slots__ = ('depth', 'score', 'best_move', 'nodes', 'cutoffs', 'first_move_cutoffs', 'probes', 'hits',
+                 'elapsed', 'pv')
+
+    def __init__(self, depth=0, score=0, best_move=None, nodes=0, cutoffs=0, first_move_cutoffs=0, probes=0, hits=0,
+                 elapsed=0.0, pv=()):
+        self.depth = depth
+        self.score = score
+        self.best_move = best_move
+        self.nodes = nodes
+        self.cutoffs = cutoffs
+        self.first_move_cutoffs = first_move_cutoffs
+        self.probes = probes
+        self.hits = hits
+        self.elapsed = elapsed
+        self.pv = list(pv)
+
+    def first_move_cutoff_rate(self):
+        """ Returns the part of the cutoffs caused by the first move searched
+        """
+        return self.first_move_cutoffs / float(self.cutoffs) if self.cutoffs else 0.0
+
+    def hit_rate(self):
+        """ Returns the part of the transposition table probes that found an entry
+        """
+        return self.hits / float(self.probes) if self.probes else 0.0
+
+    def nodes_per_second(self):
+        """ Returns the speed of the search
+        """
+        return self.nodes / self.elapsed if self.elapsed else 0.0
+
+    def __str__(self):
+        return "depth %d score %d move %s nodes %d (%d nodes/s) time %d ms first move cutoffs %.1f%% " \
+               "hit rate %.1f%% pv %s" % \
+               (self.depth, self.score, self.best_move, self.nodes, self.nodes_per_second(), self.elapsed * 1000,
+                100 * self.first_move_cutoff_rate(), 100 * self.hit_rate(), " ".join(str(x) for x in self.pv))
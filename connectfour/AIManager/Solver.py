@@ -0,0 +1,305 @@
+#####
+# Contains the exact solver: a negamax search finding the game-theoretic value of a position
+# Scores are given from the point of view of the player to move: positive means a win, negative a loss, 0 a draw
+# A win with one's own k-th piece is worth PLACES // 2 + 1 - k points, so the score also tells how many moves are left
+# until the end of the game with perfect play
+# The solver works on bitboards only and assumes NUMBER_TO_CONNECT equals 4
+#####
+
+from array import array
+from connectfour.GameplayStatics import *
+from connectfour.LevelManager.Board import COLUMN_HEIGHT, FULL_BOARD_MASK, bottom_masks, column_masks
+from connectfour.AIManager.TimeManager import clock
+
+# The amount of places on the board
+PLACES = NUMBER_OF_ROWS * NUMBER_OF_COLUMNS
+
+# Bounds of the scores that can be stored in the solver's table
+MIN_SCORE = -(PLACES // 2) + 3
+MAX_SCORE = (PLACES + 1) // 2 - 3
+
+# Mask of the bottom places of all columns
+BOTTOM_MASK = sum(bottom_masks)
+
+# Columns ordered from the centre outwards, the centre ones take part in the most lines
+COLUMN_ORDER = sorted(range(NUMBER_OF_COLUMNS), key=lambda x: abs(2 * x - NUMBER_OF_COLUMNS + 1))
+
+# The clock is checked once per this many nodes, it must be a power of two
+CLOCK_CHECK_INTERVAL = 4096
+
+
+class SolverTimeout(Exception):
+    """ Raised inside the solver when its time runs out or it is stopped
+    """
+    pass
+
+
+def next_prime(n):
+    """ Returns the smallest prime not less than n
+    """
+    while any(n % d == 0 for d in range(2, int(n ** 0.5) + 1)):
+        n += 1
+
+    return n
+
+
+# The solver's own transposition table. Positions are keyed by position + mask, which is unique and takes less than
+# 49 bits, so a prime table size and the lower 32 bits of the key identify the key exactly
+TABLE_SIZE = next_prime(1 << 21)
+
+table_keys = array('I', [0]) * TABLE_SIZE
+table_values = array('B', [0]) * TABLE_SIZE
+
+# Amount of nodes visited by the solver since the last make_solver_move
+nodes = 0
+
+# The solver stops once the clock reaches the deadline or the stop function returns True
+deadline = 0
+stop = None
+
+
+def popcount(m):
+    """ Returns the amount of set bits in m
+    """
+    return bin(m).count('1')
+
+
+def winning_position(position, mask):
+    """ Returns the mask of empty places that would complete four connected pieces of the given position
+    """
+    # Vertical
+    r = (position << 1) & (position << 2) & (position << 3)
+
+    # Horizontal and both diagonals
+    for shift in [COLUMN_HEIGHT, COLUMN_HEIGHT - 1, COLUMN_HEIGHT + 1]:
+        p = (position << shift) & (position << 2 * shift)
+        r |= p & (position << 3 * shift)
+        r |= p & (position >> shift)
+
+        p = (position >> shift) & (position >> 2 * shift)
+        r |= p & (position << shift)
+        r |= p & (position >> 3 * shift)
+
+    return r & (FULL_BOARD_MASK ^ mask)
+
+
+def can_win_next(position, mask):
+    """ Returns True if the player owning position can win with their next move
+    """
+    return winning_position(position, mask) & (mask + BOTTOM_MASK) & FULL_BOARD_MASK != 0
+
+
+def non_losing_moves(position, mask):
+    """ Returns the mask of moves that do not let the opponent win with their next move
+    If the opponent threatens to win in two places, there are none
+    """
+    possible = (mask + BOTTOM_MASK) & FULL_BOARD_MASK
+    opponent_win = winning_position(position ^ mask, mask)
+    forced = possible & opponent_win
+
+    if forced:
+        # Two threats cannot be blocked at once
+        if forced & (forced - 1):
+            return 0
+
+        possible = forced
+
+    # Never play right below a place where the opponent would win
+    return possible & ~(opponent_win >> 1)
+
+
+def negamax(position, mask, moves, alpha, beta):
+    """ Returns the score of the position if it lies in (alpha, beta), otherwise a bound on the side it fell out of
+    position is the mask of the pieces of the player to move, mask of all pieces and moves the amount of pieces
+    The player to move must not be able to win with their next move
+    """
+    global nodes
+
+    nodes += 1
+
+    if nodes & (CLOCK_CHECK_INTERVAL - 1) == 0 and (clock() >= deadline or (stop is not None and stop())):
+        raise SolverTimeout()
+
+    next_moves = non_losing_moves(position, mask)
+
+    # Every move lets the opponent win
+    if next_moves == 0:
+        return -((PLACES - moves) // 2)
+
+    # Neither player can win in the last two moves
+    if moves >= PLACES - 2:
+        return 0
+
+    # The opponent cannot win with their next move, so we cannot lose sooner than after it
+    low = -((PLACES - 2 - moves) // 2)
+
+    if alpha < low:
+        alpha = low
+
+        if alpha >= beta:
+            return alpha
+
+    # We cannot win with our next move, so we cannot win sooner than after the move after it
+    high = (PLACES - 1 - moves) // 2
+
+    if beta > high:
+        beta = high
+
+        if alpha >= beta:
+            return beta
+
+    # Narrow the window with the bound stored for this position
+    key = position + mask
+    slot = key % TABLE_SIZE
+    value = table_values[slot]
+
+    if value and table_keys[slot] == key & 0xFFFFFFFF:
+        if value > MAX_SCORE - MIN_SCORE + 1:
+            low = value + 2 * MIN_SCORE - MAX_SCORE - 2
+
+            if alpha < low:
+                alpha = low
+
+                if alpha >= beta:
+                    return alpha
+        else:
+            high = value + MIN_SCORE - 1
+
+            if beta > high:
+                beta = high
+
+                if alpha >= beta:
+                    return beta
+
+    # Try the moves creating the most threats first, centre columns first among equal ones
+    candidates = []
+
+    for rank in range(NUMBER_OF_COLUMNS):
+        move = next_moves & column_masks[COLUMN_ORDER[rank]]
+
+        if move:
+            candidates.append((popcount(winning_position(position | move, mask)), -rank, move))
+
+    candidates.sort(reverse=True)
+
+    for threats, rank, move in candidates:
+        score = -negamax(position ^ mask, mask | move, moves + 1, -beta, -alpha)
+
+        if score >= beta:
+            # Store a lower bound
+            table_keys[slot] = key & 0xFFFFFFFF
+            table_values[slot] = score + MAX_SCORE - 2 * MIN_SCORE + 2
+
+            return score
+
+        if score > alpha:
+            alpha = score
+
+    # Store an upper bound
+    table_keys[slot] = key & 0xFFFFFFFF
+    table_values[slot] = alpha - MIN_SCORE + 1
+
+    return alpha
+
+
+def solve(position, mask, moves):
+    """ Returns the exact score of the position, narrowing the possible range with null-window searches
+    """
+    if can_win_next(position, mask):
+        return (PLACES + 1 - moves) // 2
+
+    low = -((PLACES - moves) // 2)
+    high = (PLACES + 1 - moves) // 2
+
+    while low < high:
+        middle = low + (high - low) // 2
+
+        # Probe closer to 0 first, most positions are close to a draw
+        if middle <= 0 and -(-low // 2) < middle:
+            middle = -(-low // 2)
+        elif middle >= 0 and high // 2 > middle:
+            middle = high // 2
+
+        # Null-window search, telling only whether the score is above middle or not
+        r = negamax(position, mask, moves, middle, middle + 1)
+
+        if r <= middle:
+            high = r
+        else:
+            low = r
+
+    return low
+
+
+def moves_to_end(score, moves):
+    """ Returns how many moves are left until the end of the game with the given score,
+    if it was reached in a position with the given amount of pieces
+    """
+    if score == 0:
+        return PLACES - moves
+
+    # The number of the winning piece among the winner's own pieces
+    k = PLACES // 2 + 1 - abs(score)
+
+    # The player to move has moves // 2 pieces on the board and the opponent the rest
+    if score > 0:
+        return 2 * (k - moves // 2) - 1
+    else:
+        return 2 * (k - (moves + 1) // 2)
+
+
+def solve_board(board, player, time_limit=TIME_TO_MOVE, stop_function=None):
+    """ Returns the exact score of the board for the given player to move, raises SolverTimeout
+    if it takes longer than time_limit milliseconds or stop_function returns True
+    """
+    global nodes, deadline, stop
+
+    position, mask = board.get_masks(player)
+
+    nodes = 0
+    deadline = clock() + time_limit / 1000.0
+    stop = stop_function
+
+    return solve(position, mask, popcount(mask))
+
+
+def make_solver_move(board, player, time_limit=TIME_TO_MOVE, stop_function=None):
+    """ Returns the perfect move for the given player, among equally good moves the centre ones are preferred
+    Returns None if the position could not be solved within time_limit milliseconds or stop_function returned True
+    """
+    position, mask = board.get_masks(player)
+    moves = popcount(mask)
+
+    # Win at once, if able
+    win = winning_position(position, mask) & (mask + BOTTOM_MASK) & FULL_BOARD_MASK
+
+    for x in COLUMN_ORDER:
+        if win & column_masks[x]:
+            return x
+
+    next_moves = non_losing_moves(position, mask)
+
+    # Every move loses, play any of them
+    if next_moves == 0:
+        for x in COLUMN_ORDER:
+            if board.is_move_legal(x):
+                return x
+
+    try:
+        score = solve_board(board, player, time_limit, stop_function)
+
+        # Find a move that keeps the score, a null-window search is enough to check it
+        for x in COLUMN_ORDER:
+            move = next_moves & column_masks[x]
+
+            if move and -negamax(position ^ mask, mask | move, moves + 1, -score, -score + 1) >= score:
+                if DEBUG:
+                    print "solved with score " + str(score) + ", " + str(moves_to_end(score, moves)) + \
+                          " moves to the end, " + str(nodes) + " nodes"
+
+                return x
+    except SolverTimeout:
+        if DEBUG:
+            print "solver ran out of time after " + str(nodes) + " nodes"
+
+    return None
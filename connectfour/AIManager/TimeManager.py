@@ -0,0 +1,152 @@
+#####
+# Contains the time management of the AI: the clock the searches measure their time with, the decisions
+# when an iterative-deepening search should stop and the split of the AI's game clock between its moves
+#####
+
+import time
+from connectfour.GameplayStatics import *
+
+# A clock that never goes backwards, measuring the wall time, so that it is the same for all processes
+# Python 2 has no monotonic clock, the wall clock is the nearest thing to it
+clock = getattr(time, 'monotonic', time.time)
+
+# The searches read the clock only once per this many nodes, it must be a power of two
+NODES_PER_CLOCK_CHECK = 1024
+
+# The best root move is trusted once it has not changed for this many iterations...
+STABLE_ITERATIONS = 6
+
+# ...and at least this part of the time for the move has been used
+STABLE_TIME_FRACTION = 0.3
+
+# How many times longer than the previous one the next iteration is assumed to take, until two have been timed
+DEFAULT_ITERATION_GROWTH = 3.0
+
+# Even with little time left on the game clock every move gets at least this many milliseconds...
+MIN_TIME_TO_MOVE = 50
+
+# ...but never more than this part of the time left on the game clock
+MAX_TIME_FRACTION = 0.5
+
+
+class TimeManager(object):
+    """ Decides when the iterative deepening of a single move stops
+    The search never runs past the deadline, the time_limit milliseconds after the manager is created,
+    but it stops sooner if the next iteration cannot finish in time or the best move has not changed for a while
+    """
+
+    def __init__(self, time_limit):
+        self.start = clock()
+        self.time_limit = time_limit / 1000.0
+        self.deadline = self.start + self.time_limit
+
+        # The times taken by the completed iterations
+        self.iteration_times = []
+        self.iteration_start = self.start
+
+        # The best move of the last completed iteration and how many iterations in a row it has been the best one
+        self.best_move = None
+        self.stable_iterations = 0
+
+    def elapsed(self):
+        """ Returns the time in seconds since the manager was created
+        """
+        return clock() - self.start
+
+    def iteration_finished(self, best_move):
+        """ Records a completed iteration that found the given best move, the next one starts now
+        """
+        now = clock()
+
+        self.iteration_times.append(now - self.iteration_start)
+        self.iteration_start = now
+
+        if best_move == self.best_move:
+            self.stable_iterations += 1
+        else:
+            self.best_move = best_move
+            self.stable_iterations = 1
+
+    def predicted_iteration_time(self):
+        """ Returns the expected time in seconds of the next iteration, judging by how the previous ones grew
+        """
+        if not self.iteration_times:
+            return 0.0
+
+        last = self.iteration_times[-1]
+        growth = DEFAULT_ITERATION_GROWTH
+
+        if len(self.iteration_times) > 1 and self.iteration_times[-2] > 0:
+            growth = max(last / self.iteration_times[-2], 1.0)
+
+        return last * growth
+
+    def can_start_iteration(self):
+        """ Returns True if another iteration is worth starting: it is expected to finish before the deadline
+        and the best move has not yet been the same for long enough
+        """
+        now = clock()
+        self.iteration_start = now
+
+        if self.stable_iterations >= STABLE_ITERATIONS and now - self.start >= self.time_limit * STABLE_TIME_FRACTION:
+            return False
+
+        return now + self.predicted_iteration_time() < self.deadline
+
+
+class GameClock(object):
+    """ The AI's clock for a whole game: game_time milliseconds for all of its moves and increment milliseconds
+    added after every move, the time is split evenly between the moves the AI has still to search
+    Without a game time every move gets the fixed TIME_TO_MOVE
+    """
+
+    def __init__(self, game_time=GAME_TIME, increment=TIME_INCREMENT):
+        self.game_time = game_time
+        self.increment = increment
+        self.remaining = game_time
+        self.move_start = None
+
+        # The time every move of the AI took off the clock, given back if the move is taken back
+        self.charges = []
+
+    def reset(self):
+        """ Sets the clock back to the full game time
+        """
+        self.remaining = self.game_time
+        self.move_start = None
+        self.charges = []
+
+    def start_move(self, board):
+        """ Starts the clock for the AI's move on the given board, returns the time limit for the move in milliseconds
+        """
+        self.move_start = clock()
+
+        if not self.game_time:
+            return TIME_TO_MOVE
+
+        # The solver plays the end of the game in moments, so the time is split between the moves of the AI
+        # until the solver takes over, the AI making every other move
+        moves_to_go = max((board.count_empty_places() - SOLVER_THRESHOLD + 2) // 2, 1)
+
+        time_limit = min(self.remaining / moves_to_go + self.increment, self.remaining * MAX_TIME_FRACTION)
+
+        return int(max(time_limit, MIN_TIME_TO_MOVE))
+
+    def stop_move(self):
+        """ Stops the clock after the AI's move, the time it took is taken off the clock and the increment added
+        """
+        if self.move_start is None or not self.game_time:
+            return
+
+        elapsed = (clock() - self.move_start) * 1000
+        remaining = self.remaining
+
+        self.remaining = max(self.remaining - elapsed, 0) + self.increment
+        self.move_start = None
+        self.charges.append(remaining - self.remaining)
+
+    def undo_move(self):
+        """ Gives back the time the last move of the AI took off the clock, after the move was taken back
+        """
+        if self.charges:
+            self.remaining += self.charges.pop()
@@ -0,0 +1,253 @@
+#####
+# Contains a fixed-size transposition table used by the alpha-beta search
+#####
+
+import ctypes
+import multiprocessing
+from array import array
+from connectfour.GameplayStatics import *
+
+# Types of transposition table entries, 0 marks an empty slot
+ENTRY_EXACT = 1
+ENTRY_LOWER = 2
+ENTRY_UPPER = 3
+
+# Amount of bytes taken by a single slot: key, value, type, depth, max_moves, best move and generation
+SLOT_SIZE = 4 + 4 + 1 + 1 + 1 + 1 + 1
+
+# Amount of distinct generations, the generation counter wraps around after that many searches
+GENERATIONS = 256
+
+# Amount of slots in one bucket: the depth-preferred slot and the always-replace slot
+BUCKET_SIZE = 2
+
+
+class TranspositionTable(object):
+    """ A transposition table of fixed size, preallocated once and never grown
+    Every slot is spread over a few flat arrays, one value per slot in each. Slots are grouped in buckets of two:
+    the first slot of a bucket keeps the deepest entry stored in it, the second is always replaced
+    The lower bits of a hash choose the bucket and the upper 32 bits are kept as the key, so that entries
+    of different positions sharing a bucket are told apart
+    The table is meant to be kept between searches. Every search starts a new generation and entries left
+    by earlier generations are the first to be replaced, however deep they were
+    """
+
+    def __init__(self, size_mb=TRANSPOSITION_TABLE_SIZE):
+        """ Allocates a table taking at most size_mb megabytes
+        """
+        # The amount of buckets is a power of two, so that a bucket can be chosen with a mask
+        buckets = 1
+
+        while buckets * 2 * BUCKET_SIZE * SLOT_SIZE <= size_mb * 1024 * 1024:
+            buckets *= 2
+
+        self._bucket_mask = buckets - 1
+        self.size = buckets * BUCKET_SIZE
+
+        # The slots, an entry type of 0 marks an empty one
+        self.keys = self._allocate('I')
+        self.values = self._allocate('i')
+        self.types = self._allocate('B')
+        self.depths = self._allocate('B')
+        self.max_moves = self._allocate('B')
+        self.best_moves = self._allocate('b')
+        self.generations = self._allocate('B')
+
+        # The generation of the current search
+        self.generation = 0
+
+        # Statistics of the table usage
+        self.probes = 0
+        self.hits = 0
+        self.used = 0
+
+    def _allocate(self, typecode):
+        """ Returns a zeroed array of the given type holding one value per slot
+        """
+        return array(typecode, [0]) * self.size
+
+    def clear(self):
+        """ Removes all entries from the table, without reallocating it
+        """
+        self.types[:] = array('B', [0]) * self.size
+
+        self.probes = 0
+        self.hits = 0
+        self.used = 0
+
+    def new_search(self):
+        """ Starts a new generation of entries, the old ones are still used but are replaced first
+        """
+        self.generation = (self.generation + 1) % GENERATIONS
+
+        self.probes = 0
+        self.hits = 0
+
+    def _find(self, h):
+        """ Returns the slot holding the entry for the given hash, or -1 if there is no such entry
+        """
+        slot = (h & self._bucket_mask) * BUCKET_SIZE
+        key = (h >> 32) & 0xFFFFFFFF
+
+        if self.types[slot] and self.keys[slot] == key:
+            return slot
+
+        slot += 1
+
+        if self.types[slot] and self.keys[slot] == key:
+            return slot
+
+        return -1
+
+    def probe(self, h):
+        """ Returns the entry for the given hash as a tuple of its value, type, depth, max_moves and best move,
+        or None if there is no such entry
+        """
+        self.probes += 1
+
+        slot = self._find(h)
+
+        if slot == -1:
+            return None
+
+        self.hits += 1
+
+        return self.values[slot], self.types[slot], self.depths[slot], self.max_moves[slot], self.best_moves[slot]
+
+    def store(self, h, entry_type, value, depth, max_moves, move):
+        """ Stores an entry for the given hash, move is the best move found in the position or -1 if there is none
+        It goes into the depth-preferred slot if it is at least as deep as the entry there, the entry there comes
+        from an earlier search or describes the same position, otherwise it goes into the always-replace slot
+        """
+        slot = (h & self._bucket_mask) * BUCKET_SIZE
+        key = (h >> 32) & 0xFFFFFFFF
+
+        if self.types[slot] and self.keys[slot] != key and self.depths[slot] > depth and \
+                self.generations[slot] == self.generation:
+            slot += 1
+
+        if not self.types[slot]:
+            self.used += 1
+
+        self.keys[slot] = key
+        self.values[slot] = value
+        self.types[slot] = entry_type
+        self.depths[slot] = depth
+        self.max_moves[slot] = max_moves
+        self.best_moves[slot] = move
+        self.generations[slot] = self.generation
+
+    def hit_rate(self):
+        """ Returns the fraction of probes that found an entry
+        """
+        if self.probes == 0:
+            return 0.0
+
+        return float(self.hits) / self.probes
+
+    def fill_ratio(self):
+        """ Returns the fraction of slots that hold an entry
+        """
+        return float(self.used) / self.size
+
+
+class SharedTranspositionTable(TranspositionTable):
+    """ A transposition table kept in shared memory, so that all processes forked after creating it
+    or given it as an argument when they start use the same entries
+    The slots have the same fixed layout, but their arrays are allocated with multiprocessing.RawArray
+    There are no locks, processes can overwrite each other's entries and an entry can be read while it is
+    being written. The key is stored XOR-ed with the rest of the entry, so an entry whose parts
+    come from different writes does not match the key of its position and is not used
+    The generation and statistics are kept by every process on its own
+    """
+
+    def _allocate(self, typecode):
+        """ Returns a zeroed shared array of the given type holding one value per slot
+        """
+        return multiprocessing.RawArray(typecode, self.size)
+
+    def clear(self):
+        """ Removes all entries from the table, without reallocating it
+        """
+        ctypes.memset(self.types, 0, self.size)
+
+        self.probes = 0
+        self.hits = 0
+        self.used = 0
+
+    def _check(self, value, entry_type, depth, max_moves, move):
+        """ Returns the bits XOR-ed with the key of an entry holding the given fields
+        """
+        return (value ^ (entry_type | depth << 8 | max_moves << 16 | (move & 0xFF) << 24)) & 0xFFFFFFFF
+
+    def _read(self, slot, key):
+        """ Returns the entry in the given slot as a tuple of its value, type, depth, max_moves and best move,
+        or None if the slot is empty or its entry does not match the key
+        Every field is read once and the entry is checked and returned as read, since another process
+        can write to the slot in the meantime
+        """
+        entry = self.values[slot], self.types[slot], self.depths[slot], self.max_moves[slot], self.best_moves[slot]
+        stored_key = self.keys[slot]
+
+        if entry[1] and stored_key ^ self._check(*entry) == key:
+            return entry
+
+        return None
+
+    def _find(self, h):
+        """ Returns the slot holding the entry for the given hash, or -1 if there is no such entry
+        """
+        slot = (h & self._bucket_mask) * BUCKET_SIZE
+        key = (h >> 32) & 0xFFFFFFFF
+
+        if self._read(slot, key) is not None:
+            return slot
+
+        if self._read(slot + 1, key) is not None:
+            return slot + 1
+
+        return -1
+
+    def probe(self, h):
+        """ Returns the entry for the given hash as a tuple of its value, type, depth, max_moves and best move,
+        or None if there is no such entry
+        """
+        self.probes += 1
+
+        slot = (h & self._bucket_mask) * BUCKET_SIZE
+        key = (h >> 32) & 0xFFFFFFFF
+
+        entry = self._read(slot, key)
+
+        if entry is None:
+            entry = self._read(slot + 1, key)
+
+        if entry is not None:
+            self.hits += 1
+
+        return entry
+
+    def store(self, h, entry_type, value, depth, max_moves, move):
+        """ Stores an entry for the given hash, choosing the slot the same way as the table in local memory does
+        The key is written last, so that a reader sees either a whole entry or one that does not match
+        """
+        slot = (h & self._bucket_mask) * BUCKET_SIZE
+        key = (h >> 32) & 0xFFFFFFFF
+
+        if self._read(slot, key) is None and self.types[slot] and self.depths[slot] > depth and \
+                self.generations[slot] == self.generation:
+            slot += 1
+
+        self.values[slot] = value
+        self.types[slot] = entry_type
+        self.depths[slot] = depth
+        self.max_moves[slot] = max_moves
+        self.best_moves[slot] = move
+        self.generations[slot] = self.generation
+        self.keys[slot] = key ^ self._check(value, entry_type, depth, max_moves, move)
+
+    def fill_ratio(self):
+        """ Returns the fraction of slots that hold an entry, counted over the whole table,
+        since the entries are stored by all processes
+        """
+        return 1.0 - float(buffer(self.types)[:].count(chr(0))) / self.size
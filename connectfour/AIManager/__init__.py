@@ -1 +1,9 @@
 from .AIManager import *
+from .TranspositionTable import *
+from .TimeManager import *
+from .SearchStats import *
+from .Pondering import *
+from .OpeningBook import *
+from .ParallelSearch import *
+from .LazySMP import *
+from .MonteCarlo import *
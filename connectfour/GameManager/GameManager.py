@@ -28,15 +28,29 @@ def handle_move(move):
 
     # Handle a reset move
     if move == MOVE_RESET:
+        AIManager.stop_pondering()
         UserInterface.reset()
         LevelManager.reset()
+        AIManager.reset()
         return
 
     # Handle an undo move
     if move == MOVE_UNDO:
+        AIManager.stop_pondering()
+
+        # The player who made the last move is to move again once it is taken back
+        last_player = AI if UserInterface.get_current_player() == PLAYER else PLAYER
+
         UserInterface.undo_move()
         LevelManager.undo_move()
-        LevelManager.get_board().print_board(f)
+
+        # A move of the AI taken back gives back the time it took, the user interface takes back only one move
+        if last_player == AI and UserInterface.get_current_player() == AI:
+            AIManager.game_clock.undo_move()
+
+        if DEBUG:
+            LevelManager.get_board().print_board(f)
+
         return
 
     # Find the row into which the piece was placed
@@ -98,6 +112,10 @@ def main_loop():
                 player_input = AIManager.make_alpha_beta_move(LevelManager.get_board(), AIManager.basic_evaluate,
                                                               PLAYER)
             else:
+                # Let the AI search on the Player's time
+                if versus_ai and PONDERING:
+                    AIManager.start_pondering(LevelManager.get_board(), AIManager.basic_evaluate, PLAYER)
+
                 # Read player's input
                 player_input = UserInterface.get_input()
 
@@ -107,6 +125,7 @@ def main_loop():
                     (player_input == MOVE_ILLEGAL or not LevelManager.process_move(player_input, PLAYER)):
 
                 if UserInterface.is_exiting():
+                    AIManager.stop_pondering()
                     return
 
                 UserInterface.handle_illegal_move()
@@ -118,14 +137,26 @@ def main_loop():
                 else:
                     player_input = UserInterface.get_input()
 
+            # The Player has moved, so the AI's turn begins
+            AIManager.stop_pondering()
+
             # Handle the move, since it's legal
             handle_move(player_input)
         else:
 
             if versus_ai:
-                # Get an AI move'''ai_move = AIManager.make_monte_carlo_move(LevelManager.get_board(), AIManager.basic_evaluate'''                                                             PLAYER, math.sqrt(2))
-                ai_move = AIManager.make_alpha_beta_move(LevelManager.get_board(), AIManager.basic_evaluate,
-                                                         AI)
+                # The AI's clock runs while it thinks
+                time_limit = AIManager.game_clock.start_move(LevelManager.get_board())
+
+                # Use the move found while pondering, if the Player made a reply that was searched to the end
+                ai_move = AIManager.get_ponder_move(LevelManager.get_board())
+
+                if ai_move is None:
+                    # Get an AI move'''ai_move = AIManager.make_monte_carlo_move(LevelManager.get_board(), AIManager.basic_evaluate'''                                                             PLAYER, math.sqrt(2))
+                    ai_move = AIManager.make_alpha_beta_move(LevelManager.get_board(), AIManager.basic_evaluate,
+                                                             AI, time_limit=time_limit)
+
+                AIManager.game_clock.stop_move()
             else:
                 # Read player's input
                 ai_move = UserInterface.get_input()
@@ -32,3 +32,24 @@ INF = 1000000000
 
 # Time for one move (in milliseconds)
 TIME_TO_MOVE = 10000
+
+# Time for all moves of the AI in a game (in milliseconds), split between the moves, 0 gives every move TIME_TO_MOVE
+GAME_TIME = 0
+
+# Time added to the AI's game time after every move (in milliseconds)
+TIME_INCREMENT = 0
+
+# Size of the AI's transposition table (in megabytes)
+TRANSPOSITION_TABLE_SIZE = 16
+
+# Whether the AI searches on the Player's time
+PONDERING = True
+
+# Seed of the Zobrist hash values, the opening book is only valid for the seed it was built with
+ZOBRIST_SEED = 4000
+
+# File containing the opening book, a relative path is taken from the directory of the game
+BOOK_FILE = 'book.bin'
+
+# The AI plays perfectly once there are fewer empty places on the board than this
+SOLVER_THRESHOLD = 27
@@ -7,183 +7,399 @@ from connectfour.GameplayStatics import *
 
 # Zobrist hashing random bits
 
+# Generator with a fixed seed, so that hashes are the same in every run and process and can be stored on disk
+hash_random = random.Random(ZOBRIST_SEED)
 
-def gen_random_bits(n):
-    """Generates a random n-bit number"""
-    pot = 1
-    l = 0
+# Table containing Zobrist hash values of Player's and AI's pieces for each cell
+hash_table = []
 
-    for i in range(n):
-        l += pot * random.randint(0, 1)
-        pot *= 2
+# Initialise the hash_table with random bits
+hash_numbers = [hash_random.getrandbits(64) for i in range(2 * NUMBER_OF_ROWS * NUMBER_OF_COLUMNS)]
 
-    return l
+for cell in range(NUMBER_OF_ROWS * NUMBER_OF_COLUMNS):
+    hash_table.append([hash_numbers[2 * cell], hash_numbers[2 * cell + 1]])
 
 
-# Table containing Zobrist hash values for each cell
-hash_table = []
+# Bitboard layout: every column takes NUMBER_OF_ROWS + 1 consecutive bits, the lowest one being the bottom place
+# The additional bit on top of each column is always empty, so that pieces never wrap into the next column
+COLUMN_HEIGHT = NUMBER_OF_ROWS + 1
+
+# Masks of the bottom place, the top place and all places of each column
+bottom_masks = [1 << (x * COLUMN_HEIGHT) for x in range(NUMBER_OF_COLUMNS)]
+top_masks = [1 << (x * COLUMN_HEIGHT + NUMBER_OF_ROWS - 1) for x in range(NUMBER_OF_COLUMNS)]
+column_masks = [((1 << NUMBER_OF_ROWS) - 1) << (x * COLUMN_HEIGHT) for x in range(NUMBER_OF_COLUMNS)]
+
+# Mask of all places in the first column, shifted down to the lowest bits
+FIRST_COLUMN_MASK = (1 << NUMBER_OF_ROWS) - 1
+
+# Mask of all places on the board, the board is full when all of them are occupied
+FULL_BOARD_MASK = sum(column_masks)
+
+
+def gen_win_shifts():
+    """ Returns a list of bit shifts for every direction a line can go in: vertical, horizontal and both diagonals
+    Shifting a mask by all shifts of a direction and AND-ing the results leaves only the places
+    that start NUMBER_TO_CONNECT connected pieces, the run length doubles with every shift
+    """
+    shifts = []
+
+    for direction in [1, COLUMN_HEIGHT, COLUMN_HEIGHT - 1, COLUMN_HEIGHT + 1]:
+        direction_shifts = []
+        length = 1
+
+        while length < NUMBER_TO_CONNECT:
+            step = min(length, NUMBER_TO_CONNECT - length)
+            direction_shifts.append(step * direction)
+            length += step
+
+        shifts.append(direction_shifts)
+
+    return shifts
+
+
+# Bit shifts used to find connected pieces, a fixed amount for any board size
+win_shifts = gen_win_shifts()
+
+# Zobrist hash values of Player's and AI's pieces indexed by the bit of their place, to avoid computing the row
+player_hash_keys = [0 for i in range(NUMBER_OF_COLUMNS * COLUMN_HEIGHT)]
+ai_hash_keys = [0 for i in range(NUMBER_OF_COLUMNS * COLUMN_HEIGHT)]
 
-# Initialise the hash_table with random bits
 for cell in range(NUMBER_OF_ROWS * NUMBER_OF_COLUMNS):
+    bit = (cell % NUMBER_OF_COLUMNS) * COLUMN_HEIGHT + cell // NUMBER_OF_COLUMNS
+
+    player_hash_keys[bit] = hash_table[cell][0]
+    ai_hash_keys[bit] = hash_table[cell][1]
+
+# Zobrist hash values of the pieces on the places mirrored left to right, the board keeps the hash of its mirror image
+# next to its own, as both positions have the same value
+player_mirror_hash_keys = [0 for i in range(NUMBER_OF_COLUMNS * COLUMN_HEIGHT)]
+ai_mirror_hash_keys = [0 for i in range(NUMBER_OF_COLUMNS * COLUMN_HEIGHT)]
+
+for bit in range(NUMBER_OF_COLUMNS * COLUMN_HEIGHT):
+    mirrored_bit = (NUMBER_OF_COLUMNS - 1 - bit // COLUMN_HEIGHT) * COLUMN_HEIGHT + bit % COLUMN_HEIGHT
+
+    player_mirror_hash_keys[bit] = player_hash_keys[mirrored_bit]
+    ai_mirror_hash_keys[bit] = ai_hash_keys[mirrored_bit]
+
+
+def gen_lines():
+    """ Returns the masks of all lines of NUMBER_TO_CONNECT places on the board, in every direction
+    """
+    lines = []
+
+    # Directions as steps in columns and rows: vertical, horizontal and both diagonals
+    for dx, dy in [(0, 1), (1, 0), (1, 1), (1, -1)]:
+        for x in range(NUMBER_OF_COLUMNS):
+            for y in range(NUMBER_OF_ROWS):
+                end_x = x + dx * (NUMBER_TO_CONNECT - 1)
+                end_y = y + dy * (NUMBER_TO_CONNECT - 1)
+
+                if 0 <= end_x < NUMBER_OF_COLUMNS and 0 <= end_y < NUMBER_OF_ROWS:
+                    lines.append(sum(1 << ((x + dx * i) * COLUMN_HEIGHT + y + dy * i)
+                                     for i in range(NUMBER_TO_CONNECT)))
+
+    return lines
 
-    hash_table.append([])
 
-    hash_table[cell].append(gen_random_bits(64))
-    hash_table[cell].append(gen_random_bits(64))
+# Every line in which NUMBER_TO_CONNECT pieces can be connected, 69 of them on the standard board
+lines = gen_lines()
 
+# The lines going through each place, indexed by its bit
+bit_lines = [tuple(line for line in lines if line >> bit & 1) for bit in range(NUMBER_OF_COLUMNS * COLUMN_HEIGHT)]
 
-class Board:
+
+def gen_line_popcounts():
+    """ Returns the amount of pieces in every subset of every line, keyed by the mask of the subset
+    """
+    popcounts = {}
+
+    for line in lines:
+        line_bits = [1 << bit for bit in range(NUMBER_OF_COLUMNS * COLUMN_HEIGHT) if line >> bit & 1]
+
+        for subset in range(1 << NUMBER_TO_CONNECT):
+            mask = sum(line_bits[i] for i in range(NUMBER_TO_CONNECT) if subset >> i & 1)
+            popcounts[mask] = bin(subset).count('1')
+
+    return popcounts
+
+
+# The amount of pieces of a line, so that they are counted with a single lookup
+line_popcounts = gen_line_popcounts()
+
+# Score of a line holding the given amount of pieces of only one player, open twos and threes are worth the most
+# A full line ends the game, so its score is never used
+line_weights = [0] + [4 ** (k - 1) for k in range(1, NUMBER_TO_CONNECT)] + [0]
+
+
+def gen_line_deltas():
+    """ Returns the change of the score of a player placing a piece in a line that holds the given amounts of
+    their own and their opponent's pieces, indexed by these amounts
+    """
+    deltas = []
+
+    for own in range(NUMBER_TO_CONNECT + 1):
+        deltas.append([])
+
+        for opponent in range(NUMBER_TO_CONNECT + 1):
+            if opponent == 0 and own < NUMBER_TO_CONNECT:
+                # The player's line grows
+                deltas[own].append(line_weights[own + 1] - line_weights[own])
+            elif own == 0:
+                # The opponent's line cannot be completed anymore
+                deltas[own].append(line_weights[opponent])
+            else:
+                # The line was of no use to anybody already
+                deltas[own].append(0)
+
+    return deltas
+
+
+line_deltas = gen_line_deltas()
+
+
+def line_score_delta(own_mask, opponent_mask, bit):
+    """ Returns the change of the score of a player placing a piece on the given bit, given the masks of their
+    own and their opponent's pieces before the move
+    """
+    delta = 0
+
+    for line in bit_lines[bit]:
+        delta += line_deltas[line_popcounts[own_mask & line]][line_popcounts[opponent_mask & line]]
+
+    return delta
+
+
+def line_score(player_mask, ai_mask):
+    """ Returns the score of all lines on the board from the Player's point of view, computed from scratch
+    """
+    score = 0
+
+    for line in lines:
+        if ai_mask & line == 0:
+            score += line_weights[line_popcounts[player_mask & line]]
+        elif player_mask & line == 0:
+            score -= line_weights[line_popcounts[ai_mask & line]]
+
+    return score
+
+
+def is_winning_mask(mask):
+    """ Returns True if the pieces in the given mask contain NUMBER_TO_CONNECT connected pieces in any direction
+    """
+    for direction_shifts in win_shifts:
+        m = mask
+
+        for shift in direction_shifts:
+            m &= m >> shift
+
+        if m:
+            return True
+
+    return False
+
+
+class Board(object):
     """ The class representing the game board, contains functions to manipulate the board
     It is immutable by design, so once created it cannot be changed This is why making a move returns a new Board object
-    An empty place is represented by a ' ' char, Player's piece is represented by an 'O' char
-    and AI piece is represented by an 'X' char
+    The only exception are play() and undo(), which change the board in place and are meant for the AI search,
+    which works on its own copy of the board
+    The pieces are stored as bitboards: one integer mask for the Player's pieces, one for the AI's pieces
+    and one for all occupied places, which also determines the height of every column
+    An empty place is reported as a ' ' char, Player's piece as an 'O' char and AI piece as an 'X' char
     """
 
+    __slots__ = ('_player_mask', '_ai_mask', '_mask', 'last_move', 'hash', 'mirror_hash', 'score')
+
     def __init__(self):
-        """ Creates an empty board and the counters list
+        """ Creates an empty board
         """
-        # List of lists representing the game board with chars ' ', 'O' and 'X'
-        self._board = [[' ' for x in range(NUMBER_OF_COLUMNS)] for y in range(NUMBER_OF_ROWS)]
+        # Masks of places taken by Player's and AI's pieces
+        self._player_mask = 0
+        self._ai_mask = 0
 
-        # List counting the amount of pieces in each column, to speed up move generation
-        self._counters = [0 for x in range(NUMBER_OF_COLUMNS)]
+        # Mask of all occupied places
+        self._mask = 0
 
         # The last move that was performed on the board
         self.last_move = -1
 
-        # The Zobrist hash of the board
+        # The Zobrist hash of the board and of its mirror image
         self.hash = 0
+        self.mirror_hash = 0
+
+        # The score of all lines from the Player's point of view
+        self.score = 0
 
     def copy(self):
         """ Returns a new object exactly the same as this one
         """
         new = Board()
 
-        new._board = [[self._board[y][x] for x in range(NUMBER_OF_COLUMNS)] for y in range(NUMBER_OF_ROWS)]
-        new._counters = [self._counters[x] for x in range(NUMBER_OF_COLUMNS)]
+        new._player_mask = self._player_mask
+        new._ai_mask = self._ai_mask
+        new._mask = self._mask
+        new.last_move = self.last_move
         new.hash = self.hash
+        new.mirror_hash = self.mirror_hash
+        new.score = self.score
 
         return new
 
+    def __getstate__(self):
+        """ Returns the compact form of the board used to send it to other processes: both players' bitboards
+        and the last move
+        """
+        return self._player_mask, self._ai_mask, self.last_move
+
+    def __setstate__(self, state):
+        """ Restores the board from its compact form, recomputing the occupied places, the hashes and the score
+        """
+        self._player_mask, self._ai_mask, self.last_move = state
+        self._mask = self._player_mask | self._ai_mask
+        self.hash = 0
+        self.mirror_hash = 0
+
+        for bit in range(NUMBER_OF_COLUMNS * COLUMN_HEIGHT):
+            if self._player_mask >> bit & 1:
+                self.hash ^= player_hash_keys[bit]
+                self.mirror_hash ^= player_mirror_hash_keys[bit]
+            elif self._ai_mask >> bit & 1:
+                self.hash ^= ai_hash_keys[bit]
+                self.mirror_hash ^= ai_mirror_hash_keys[bit]
+
+        self.score = line_score(self._player_mask, self._ai_mask)
+
     def print_board(self, f):
         """ Prints the board to standard output
         """
         for y in range(NUMBER_OF_ROWS - 1, -1, -1):
-            f.write(str(self._board[y]) + "\n")
+            f.write(str([self.get_piece(y, x) for x in range(NUMBER_OF_COLUMNS)]) + "\n")
         f.write("\n\n")
 
     def is_move_legal(self, column):
         """ Returns True if a legal move can be made in the given column, False otherwise
         """
-        if self._counters[column] >= NUMBER_OF_ROWS:
-            return False
-        else:
-            return True
+        return self._mask & top_masks[column] == 0
 
     def get_piece(self, row, column):
         """ Returns the player that put a piece on the given place
         """
-        return self._board[row][column]
+        place = 1 << (column * COLUMN_HEIGHT + row)
+
+        if self._player_mask & place:
+            return PLAYER
+        elif self._ai_mask & place:
+            return AI
+        else:
+            return ' '
+
+    def get_masks(self, player):
+        """ Returns the bitboard of the given player's pieces and the bitboard of all pieces
+        """
+        if player == PLAYER:
+            return self._player_mask, self._mask
+        else:
+            return self._ai_mask, self._mask
 
     def get_counter(self, column):
         """ Returns the amount of pieces currently in the given column
         """
-        return self._counters[column]
+        # Pieces in a column are always contiguous from the bottom, so the highest set bit gives the amount
+        return ((self._mask >> (column * COLUMN_HEIGHT)) & FIRST_COLUMN_MASK).bit_length()
+
+    def count_empty_places(self):
+        """ Returns the amount of empty places on the board
+        """
+        return NUMBER_OF_ROWS * NUMBER_OF_COLUMNS - bin(self._mask).count('1')
 
     def make_move(self, column, player):
         """ Returns a new Board() object with an appropriate char on top of the given column
         ('O' if is_player equals True, 'X' if it equals False)
-        If the column is already full an IndexError exception is raised
+        If the column is already full the move is reported and no piece is placed
         """
-        row = self._counters[column]
-
         # Create a new Board() object, since Board is immutable
         new = self.copy()
 
-        try:
-            if player == PLAYER:
-                new._board[row][column] = PLAYER
-            else:
-                new._board[row][column] = AI
-        except IndexError:
+        if not self.is_move_legal(column):
             print "Board.make_move(" + str(column) + ", " + player + "tried to make an illegal move"
+            return new
 
-        # Update the appropriate counter
-        new._counters[column] = row + 1
+        new.play(column, player)
 
-        # Set the last move to the one just performed
-        new.last_move = column
+        return new
+
+    def play(self, column, player):
+        """ Puts the player's piece on top of the given column, changing this board in place
+        The column must not be full
+        """
+        # Adding the bottom bit to the column carries over all its pieces onto the first empty place
+        move = (self._mask + bottom_masks[column]) & column_masks[column]
+        bit = move.bit_length() - 1
 
-        # Update the hash of the board accordingly
-        cell_num = row * NUMBER_OF_COLUMNS + column
+        self._mask |= move
 
+        # Update the player's pieces, the hashes and the score of the board accordingly
         if player == PLAYER:
-            new.hash ^= hash_table[cell_num][0]
+            self.score += line_score_delta(self._player_mask, self._ai_mask, bit)
+            self._player_mask |= move
+            self.hash ^= player_hash_keys[bit]
+            self.mirror_hash ^= player_mirror_hash_keys[bit]
         else:
-            new.hash ^= hash_table[cell_num][1]
+            self.score -= line_score_delta(self._ai_mask, self._player_mask, bit)
+            self._ai_mask |= move
+            self.hash ^= ai_hash_keys[bit]
+            self.mirror_hash ^= ai_mirror_hash_keys[bit]
 
-        return new
+        # Set the last move to the one just performed
+        self.last_move = column
+
+    def undo(self, column):
+        """ Takes the top piece off the given column, changing this board in place
+        It reverts play(column, player), but the move played before it is not known anymore, so last_move is cleared
+        """
+        # The piece just below the first empty place of the column is the top one
+        move = ((self._mask + bottom_masks[column]) >> 1) & column_masks[column]
+        bit = move.bit_length() - 1
+
+        self._mask ^= move
+
+        # Update the owner's pieces, the hashes and the score of the board accordingly
+        if self._player_mask & move:
+            self._player_mask ^= move
+            self.hash ^= player_hash_keys[bit]
+            self.mirror_hash ^= player_mirror_hash_keys[bit]
+            self.score -= line_score_delta(self._player_mask, self._ai_mask, bit)
+        else:
+            self._ai_mask ^= move
+            self.hash ^= ai_hash_keys[bit]
+            self.mirror_hash ^= ai_mirror_hash_keys[bit]
+            self.score += line_score_delta(self._ai_mask, self._player_mask, bit)
+
+        self.last_move = -1
 
     def check_game_over(self):
         """ Checks the game ending conditions and returns a string representing the outcome
         'Player' if Player won, 'AI' if AI won, 'Draw' if the game ended in a draw or 'Null' if the game is not over
+        Only the player who made the last move can have won, so only their pieces are checked
         """
+        if self.last_move == -1:
+            # We do not know who moved last, so check both players
+            if is_winning_mask(self._player_mask):
+                return OUTCOME_PLAYER
+            elif is_winning_mask(self._ai_mask):
+                return OUTCOME_AI
+        else:
+            # The piece just below the first empty place of the column is the one placed by the last move
+            last_piece = ((self._mask + bottom_masks[self.last_move]) >> 1) & column_masks[self.last_move]
 
-        # If the board is full, we have a draw
-        if self._counters.count(NUMBER_OF_ROWS) == NUMBER_OF_COLUMNS:
-            return OUTCOME_DRAW
-
-        # Utility function
-        def check_line(x, y, x_step, y_step):
-            """ Checks a straight line from point (x, y) with step (x_step, y_step) for any 4 connected pieces
-            """
-            cnt = 0
-            prev = ' '
-
-            while 0 <= x < NUMBER_OF_COLUMNS and 0 <= y < NUMBER_OF_ROWS:
-                if self._board[y][x] == prev:
-                    cnt += 1
-
-                    if cnt == NUMBER_TO_CONNECT:
-                        if prev == PLAYER:
-                            return OUTCOME_PLAYER
-                        elif prev == AI:
-                            return OUTCOME_AI
-                else:
-                    prev = self._board[y][x]
-                    cnt = 1
-
-                x += x_step
-                y += y_step
-
-            return OUTCOME_NOTHING
-
-        last_x = self.last_move
-        last_y = self._counters[self.last_move] - 1
-
-        # Check the straight, vertical line through the (last_x, last_y) point
-        outcome = check_line(last_x, 0, 0, 1)
-
-        if outcome != OUTCOME_NOTHING:
-            return outcome
-
-        # Check the straight, horizontal line through the (last_x, last_y) point
-        outcome = check_line(0, last_y, 1, 0)
-
-        if outcome != OUTCOME_NOTHING:
-            return outcome
-
-        minn = min(last_x, last_y)
-
-        # Check the straight, diagonal line through the (last_x, last_y) point, going from bottom-left to top-right
-        outcome = check_line(last_x - minn, last_y - minn, 1, 1)
-
-        if outcome != OUTCOME_NOTHING:
-            return outcome
-
-        minn = min(NUMBER_OF_COLUMNS - last_x - 1, last_y)
+            if self._player_mask & last_piece:
+                if is_winning_mask(self._player_mask):
+                    return OUTCOME_PLAYER
+            elif is_winning_mask(self._ai_mask):
+                return OUTCOME_AI
 
-        # Check the straight, diagonal line through the (last_x, last_y) point, going from bottom-right to top-left
-        outcome = check_line(last_x + minn, last_y - minn, -1, 1)
+        # If the board is full and nobody has won, we have a draw
+        if self._mask == FULL_BOARD_MASK:
+            return OUTCOME_DRAW
 
-        return outcome
+        return OUTCOME_NOTHING
@@ -0,0 +1,122 @@
+#####
+# Contains the perft functions, which walk the whole game tree to a given depth and count the positions in it
+# Comparing their counts with the known ones checks the move generation and the game ending conditions of the Board
+# and the time they take measures its raw speed
+#####
+
+import multiprocessing
+from connectfour.GameplayStatics import *
+
+# Amounts of move sequences of the given length on the empty standard board, the index being the length
+# A game that ended before the length is reached does not count, a game ending with the last move does
+PERFT_RESULTS = [1, 7, 49, 343, 2401, 16807, 117649, 823536, 5673234]
+
+# Amounts of different positions after the given amount of moves on the empty standard board,
+# a position reached by different sequences of moves counts once
+UNIQUE_POSITIONS = [1, 7, 49, 238, 1120, 4263, 16422, 54859, 184275, 558186, 1662623, 4568683]
+
+
+def perft(board, depth, player):
+    """ Returns the amount of move sequences of the given length on the given board, starting with the given player,
+    the game must not be over on the board
+    The board is changed during the walk and restored at its end
+    """
+    if depth == 0:
+        return 1
+
+    opponent = AI if player == PLAYER else PLAYER
+    leaves = 0
+
+    # Undoing a move clears the last move of the board, it is put back at the end
+    last_move = board.last_move
+
+    for x in range(NUMBER_OF_COLUMNS):
+        if board.is_move_legal(x):
+            board.play(x, player)
+
+            # The moves after the game ended are not played
+            if depth == 1:
+                leaves += 1
+            elif board.check_game_over() == OUTCOME_NOTHING:
+                leaves += perft(board, depth - 1, opponent)
+
+            board.undo(x)
+
+    board.last_move = last_move
+
+    return leaves
+
+
+def perft_unique(board, depth, player):
+    """ Returns the amount of different positions after the given amount of moves on the given board,
+    starting with the given player, the game must not be over on the board
+    Positions are told apart by their hashes and every position is only walked the first time it is reached,
+    so the transpositions make the walk much shorter than the one of perft
+    The board is changed during the walk and restored at its end
+    """
+    # The hashes of all positions reached so far, the amount of pieces is part of the position,
+    # so positions at different depths never share a hash
+    seen = set()
+
+    def walk(depth, player):
+        """ Walks the positions following the board, returns the amount of new positions at the given depth
+        """
+        opponent = AI if player == PLAYER else PLAYER
+        leaves = 0
+
+        for x in range(NUMBER_OF_COLUMNS):
+            if board.is_move_legal(x):
+                board.play(x, player)
+
+                if board.hash not in seen:
+                    seen.add(board.hash)
+
+                    if depth == 1:
+                        leaves += 1
+                    elif board.check_game_over() == OUTCOME_NOTHING:
+                        leaves += walk(depth - 1, opponent)
+
+                board.undo(x)
+
+        return leaves
+
+    if depth == 0:
+        return 1
+
+    last_move = board.last_move
+    leaves = walk(depth, player)
+    board.last_move = last_move
+
+    return leaves
+
+
+def perft_root_move(task):
+    """ Counts the move sequences following a single root move in a worker process,
+    the board comes pickled in its compact form
+    """
+    board, move, depth, player = task
+
+    board.play(move, player)
+
+    if depth > 1 and board.check_game_over() != OUTCOME_NOTHING:
+        return 0
+
+    return perft(board, depth - 1, AI if player == PLAYER else PLAYER)
+
+
+def perft_parallel(board, depth, player, processes=None):
+    """ Returns the same amount as perft, the moves at the root are split between the processes of a new pool,
+    by default as many as there are CPUs
+    """
+    if depth == 0:
+        return 1
+
+    tasks = [(board, x, depth, player) for x in range(NUMBER_OF_COLUMNS) if board.is_move_legal(x)]
+
+    pool = multiprocessing.Pool(processes)
+
+    try:
+        return sum(pool.map(perft_root_move, tasks))
+    finally:
+        pool.close()
+        pool.join()
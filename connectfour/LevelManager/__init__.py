@@ -1,2 +1,3 @@
 from .LevelManager import *
 from .Board import *
+from .Perft import *
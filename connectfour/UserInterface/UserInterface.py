@@ -1,9 +1,9 @@
 #####
 # This module handles displaying information on the screen, as well as getting the user's input
+# The graphics library creates its Tk root at import, which needs a display, so it is only imported
+# once the game window is created, and the engine can be used without a display
 #####
 
-from graphics import *
-
 from connectfour.GameplayStatics import *
 
 # The one and only game window
@@ -43,6 +43,14 @@ _current_player = PLAYER
 # Whether or not we can undo a move
 _undo_available = False
 
+
+def color_rgb(r, g, b):
+    """ Returns the color with the given red, green and blue components in the form Tk takes it,
+    the same as the one of the graphics library, which is not imported yet when the colors are defined
+    """
+    return "#%02x%02x%02x" % (r, g, b)
+
+
 # Colors
 PLAYER_COLOR = color_rgb(255, 51, 51)
 PLAYER_WIN_COLOR = color_rgb(200, 25, 25)
@@ -76,6 +84,14 @@ def set_move(current):
         raise RuntimeError
 
 
+def load_graphics():
+    """ Imports the parts of the graphics library used by the game window into this module
+    """
+    global GraphWin, GraphicsError, Point, Line, Circle, Rectangle, Text
+
+    from graphics import GraphWin, GraphicsError, Point, Line, Circle, Rectangle, Text
+
+
 def startup(starting_player):
     """ Called once at program startup. Creates the game window and the graphics that are permanently on the screen
     """
@@ -84,6 +100,9 @@ def startup(starting_player):
     global _move_indicator
     global _numbers_image
 
+    # The graphics library is only needed from now on
+    load_graphics()
+
     # Create the game window
     _window = GraphWin("Connect4", WINDOW_SIZE_X, WINDOW_SIZE_Y)
     _window.setBackground(BACKGROUND_COLOR)